@@ -0,0 +1,92 @@
+"""
+Startup-time guard for the lightweight CLI commands.
+
+Runs `python -m uraf.cli history|compare` against a synthetic results file and fails
+if the median wall time exceeds the budget, or if any heavy ML dependency is
+imported along the way.
+
+    python benchmarks/cli_startup.py --budget 1.0 --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = [
+    "torch", "sentence_transformers", "evaluate", "guidance", "keybert",
+    "bertopic", "transformers", "tqdm", "aiohttp", "uraf.evaluate_agents"
+]
+
+IMPORT_CHECK = """
+import sys
+from uraf.cli import main
+sys.argv = ["uraf", *sys.argv[1:]]
+main()
+heavy = [name for name in {heavy!r} if name in sys.modules]
+if heavy:
+    print("HEAVY:" + ",".join(heavy), file=sys.stderr)
+    sys.exit(3)
+"""
+
+
+def write_fixture(directory, records):
+    results_path = os.path.join(directory, "results.json")
+    with open(results_path, "w") as f:
+        for i in range(records):
+            json.dump({
+                "timestamp": f"2025-02-01T00:00:{i % 60:02d}",
+                "model": f"model-{i % 3}",
+                "agent_type": "Decision-Making Agent",
+                "evaluation": {"URAF Score": float(i % 10)}
+            }, f)
+            f.write("\n")
+
+    config_path = os.path.join(directory, "config.yaml")
+    with open(config_path, "w") as f:
+        f.write(f'storage:\n  benchmark_results_path: "{results_path}"\n')
+    return config_path
+
+
+def time_command(command, config_path, runs):
+    env = {**os.environ, "PYTHONPATH": REPO_ROOT}
+    script = IMPORT_CHECK.format(heavy=HEAVY_MODULES)
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-c", script, command, "--config", config_path],
+            env=env, capture_output=True, text=True
+        )
+        timings.append(time.perf_counter() - started)
+        if completed.returncode != 0:
+            sys.exit(f"`{command}` failed ({completed.returncode}):\n{completed.stderr[-2000:]}")
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=1.0, help="Maximum median seconds per command")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per command")
+    parser.add_argument("--records", type=int, default=1000, help="Synthetic results in the fixture")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = write_fixture(directory, args.records)
+        failed = False
+        for command in ("history", "compare"):
+            median = time_command(command, config_path, args.runs)
+            status = "ok" if median <= args.budget else "SLOW"
+            failed |= median > args.budget
+            print(f"{command:8s} median {median * 1000:7.1f} ms  (budget {args.budget * 1000:.0f} ms)  {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Micro-benchmark of prompt rendering cost per request.
+
+Compares parsing each technique's guidance template on every call (the old
+behaviour) against `PromptManager.render_prompt`, which parses and renders each
+template once and only substitutes the task.
+
+    python benchmarks/prompt_rendering.py --requests 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import guidance  # noqa: E402
+from uraf.prompt_manager import PromptManager  # noqa: E402
+
+TECHNIQUES = ["base", "tree-of-thoughts", "self-consistency", "self-critique"]
+
+
+def per_request_us(render, requests):
+    started = time.perf_counter()
+    for i in range(requests):
+        render(f"Benchmark question #{i}: explain the impact of inflation on global markets.")
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Prompts rendered per technique")
+    args = parser.parse_args()
+
+    print(f"{'technique':18s} {'uncached':>12s} {'compiled':>12s} {'speedup':>8s}")
+    for technique in TECHNIQUES:
+        template = PromptManager.TEMPLATES[technique]
+        uncached = per_request_us(lambda task: str(guidance(template)(task=task)), args.requests)
+        PromptManager.render_parts(technique)  # warm the cache, as the first request would
+        compiled = per_request_us(lambda task: PromptManager.render_prompt(task, technique), args.requests)
+        print(f"{technique:18s} {uncached:9.1f} us {compiled:9.1f} us {uncached / compiled:7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import json
+import numpy as np
+import pytest
+from uraf.aggregates import AggregateIndex, P2Quantile, ScoreAggregate
+
+
+@pytest.mark.parametrize("p", [0.5, 0.9])
+def test_exact_quantiles_below_limit(p):
+    values = np.random.default_rng(0).uniform(0, 10, size=150)
+    quantile = P2Quantile(p)
+    for value in values:
+        quantile.add(float(value))
+    assert quantile.value() == pytest.approx(np.percentile(values, p * 100, method="nearest"))
+
+
+@pytest.mark.parametrize("p", [0.5, 0.9])
+@pytest.mark.parametrize("distribution", ["uniform", "normal", "exponential"])
+def test_p2_quantiles_track_numpy(p, distribution):
+    rng = np.random.default_rng(1)
+    values = {
+        "uniform": lambda: rng.uniform(0, 10, size=20000),
+        "normal": lambda: rng.normal(5, 2, size=20000),
+        "exponential": lambda: rng.exponential(2, size=20000),
+    }[distribution]()
+    quantile = P2Quantile(p)
+    for value in values:
+        quantile.add(float(value))
+    spread = np.percentile(values, 99) - np.percentile(values, 1)
+    assert abs(quantile.value() - np.percentile(values, p * 100)) < 0.02 * spread
+
+
+def test_p2_round_trip_continues_identically():
+    values = np.random.default_rng(2).normal(size=1000)
+    original = P2Quantile(0.9)
+    for value in values[:500]:
+        original.add(float(value))
+    restored = P2Quantile.from_dict(json.loads(json.dumps(original.to_dict())))
+    for value in values[500:]:
+        original.add(float(value))
+        restored.add(float(value))
+    assert restored.value() == original.value()
+
+
+def test_score_aggregate_matches_batch_statistics():
+    scores = np.random.default_rng(3).uniform(0, 10, size=1000)
+    aggregate = ScoreAggregate(threshold=7.0)
+    for score in scores:
+        aggregate.add(float(score))
+    summary = aggregate.summary()
+
+    assert summary["count"] == len(scores)
+    assert summary["mean"] == pytest.approx(scores.mean())
+    assert summary["variance"] == pytest.approx(scores.var(ddof=1))
+    assert summary["min"] == scores.min()
+    assert summary["max"] == scores.max()
+    assert summary["pass_rate"] == pytest.approx((scores >= 7.0).mean())
+    assert summary["p50"] == pytest.approx(np.percentile(scores, 50), abs=0.2)
+    assert summary["p90"] == pytest.approx(np.percentile(scores, 90), abs=0.2)
+
+
+def test_aggregate_index_save_and_load(tmp_path):
+    index = AggregateIndex(thresholds={"Decision-Making Agent": 7.0})
+    for score in (6.0, 8.0, 9.0):
+        index.add("model-a", "Decision-Making Agent", score)
+    path = str(tmp_path / "results.summary.json")
+    index.save(path)
+
+    restored = AggregateIndex.load(path, thresholds={"Decision-Making Agent": 7.0})
+    assert restored.summary() == index.summary()
+    assert restored.summary()["model-a"]["Decision-Making Agent"]["pass_rate"] == pytest.approx(2 / 3)
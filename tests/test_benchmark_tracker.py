@@ -0,0 +1,64 @@
+import json
+from uraf.benchmark_tracker import BenchmarkTracker
+from uraf.result_store import JSONLResultStore
+
+
+def make_tracker(tmp_path):
+    return BenchmarkTracker(str(tmp_path / "results.json"), flush_records=100, flush_interval=None)
+
+
+def test_torn_and_corrupt_lines_are_skipped(tmp_path):
+    tracker = make_tracker(tmp_path)
+    tracker.save_result("model-a", "planner", {"URAF Score": 6.0})
+    tracker.save_result("model-a", "planner", {"URAF Score": 8.0})
+    tracker.flush()
+
+    with open(tracker.save_path, "a") as f:
+        f.write("not json\n")
+        f.write(json.dumps({"model": "model-a"}) + "\n")  # Missing fields
+    complete_end = tracker.store.end_position()
+    with open(tracker.save_path, "a") as f:
+        f.write('{"timestamp": "2025-01-01T00:00:00", "model": "mo')  # Torn trailing line
+
+    assert [r["evaluation"]["URAF Score"] for r in tracker.iter_results()] == [6.0, 8.0]
+
+    # The partial trailing line is left for a later tail
+    rows = list(tracker.store.tail(0))
+    assert [score for _, _, score, _ in rows] == [6.0, 8.0]
+    assert tracker.compare_models()["model-a"]["planner"]["count"] == 2
+    assert tracker._aggregates.position <= complete_end
+
+    # The next append starts on a fresh line; the torn record is skipped for good
+    tracker.save_result("model-a", "planner", {"URAF Score": 10.0})
+    assert [r["evaluation"]["URAF Score"] for r in tracker.iter_results()] == [6.0, 8.0, 10.0]
+    assert tracker.compare_models()["model-a"]["planner"]["count"] == 3
+    assert tracker._aggregates.position == tracker.store.end_position()
+    tracker.close()
+
+
+def test_tail_resumes_once_a_partial_line_is_completed(tmp_path):
+    path = tmp_path / "results.json"
+    store = JSONLResultStore(str(path))
+    line = json.dumps({"timestamp": "2025-01-01T00:00:00", "model": "m", "agent_type": "a",
+                       "evaluation": {"URAF Score": 4.0}}) + "\n"
+    with open(path, "w") as f:
+        f.write(line[:30])
+    assert list(store.tail(0)) == []
+
+    with open(path, "a") as f:
+        f.write(line[30:])
+    assert list(store.tail(0)) == [("m", "a", 4.0, len(line))]
+
+
+def test_summary_persists_position_across_trackers(tmp_path):
+    tracker = make_tracker(tmp_path)
+    for score in (2.0, 4.0, 6.0):
+        tracker.save_result("model-a", "critic", {"URAF Score": {"Total Score": score}})
+    assert tracker.compare_models()["model-a"]["critic"]["mean"] == 4.0
+    tracker.close()
+
+    reopened = make_tracker(tmp_path)
+    reopened.save_result("model-a", "critic", {"URAF Score": 8.0})
+    summary = reopened.compare_models()["model-a"]["critic"]
+    assert summary["count"] == 4 and summary["mean"] == 5.0
+    reopened.close()
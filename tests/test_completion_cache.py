@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+from uraf.completion_cache import CompletionCache
+
+
+def make_cache(tmp_path, **kwargs):
+    return CompletionCache(str(tmp_path / "completions.sqlite"), **kwargs)
+
+
+def key(prompt, sample=0, temperature=0.5):
+    return CompletionCache.make_key("model", "http://localhost:1234/v1/completions", prompt,
+                                    temperature=temperature, top_p=0.85, top_k=50, max_tokens=4000, sample=sample)
+
+
+def test_key_covers_parameters_and_sample():
+    assert key("q") == key("q")
+    assert key("q") != key("q", sample=1)
+    assert key("q") != key("q", temperature=0.7)
+    assert key("q") != key("q2")
+
+
+def test_read_write_round_trip_and_persistence(tmp_path):
+    cache = make_cache(tmp_path)
+    assert cache.get(key("q")) is None
+    cache.put(key("q"), {"summary": "answer"})
+    assert cache.get(key("q")) == {"summary": "answer"}
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    cache.close()
+
+    reopened = make_cache(tmp_path)
+    assert reopened.get(key("q")) == {"summary": "answer"}
+    assert reopened.stats()["bytes"] == cache.stats()["bytes"]
+
+
+def test_modes(tmp_path):
+    make_cache(tmp_path).put(key("q"), {"summary": "stored"})
+
+    read_only = make_cache(tmp_path, mode="read")
+    read_only.put(key("new"), {"summary": "ignored"})
+    assert read_only.get(key("q")) == {"summary": "stored"}
+    assert read_only.get(key("new")) is None
+
+    write_only = make_cache(tmp_path, mode="write")
+    assert write_only.get(key("q")) is None
+    write_only.put(key("q"), {"summary": "refreshed"})
+    assert make_cache(tmp_path).get(key("q")) == {"summary": "refreshed"}
+
+    bypass = make_cache(tmp_path, mode="bypass")
+    bypass.put(key("other"), {"summary": "ignored"})
+    assert bypass.get(key("q")) is None
+    assert make_cache(tmp_path).get(key("other")) is None
+
+    with pytest.raises(ValueError):
+        make_cache(tmp_path, mode="sometimes")
+
+
+def test_replacing_an_entry_does_not_inflate_size(tmp_path):
+    cache = make_cache(tmp_path)
+    for _ in range(10):
+        cache.put(key("q"), {"summary": "x" * 100})
+    assert cache.stats()["bytes"] == cache._stored_bytes()
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    entry = {"summary": "x" * 100}
+    entry_size = len('{"summary": "' + "x" * 100 + '"}')
+    cache = make_cache(tmp_path, max_bytes=entry_size * 10)
+    for i in range(10):
+        cache.put(key(f"q{i}"), entry)
+    assert cache.get(key("q0")) == entry  # q0 becomes the most recently used
+
+    cache.put(key("q10"), entry)  # Over budget: evict down to 90%
+    assert cache.stats()["bytes"] <= cache.max_bytes * 0.9
+    assert cache.stats()["bytes"] == cache._stored_bytes()
+    assert cache.get(key("q0")) == entry
+    assert cache.get(key("q10")) == entry
+    assert cache.get(key("q1")) is None
+    assert cache.get(key("q2")) is None
+
+
+def test_async_wrappers(tmp_path):
+    cache = make_cache(tmp_path)
+
+    async def round_trip():
+        await cache.aput(key("q"), {"summary": "async"})
+        return await cache.aget(key("q"))
+
+    assert asyncio.run(round_trip()) == {"summary": "async"}
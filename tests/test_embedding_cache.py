@@ -0,0 +1,106 @@
+import multiprocessing
+import os
+import numpy as np
+import pytest
+from uraf.embedding_cache import EmbeddingCache, _DiskStore
+
+DIM = 8
+NAMESPACE = "all-MiniLM-L6-v2"
+
+
+def vector_for(text_hash):
+    """Deterministic vector derived from the hash, so any misaligned row is detectable."""
+    return np.random.default_rng(int(text_hash[:8], 16)).random(DIM).astype(np.float32)
+
+
+def items_for(texts):
+    hashes = [EmbeddingCache.text_hash(text) for text in texts]
+    return [(text_hash, vector_for(text_hash)) for text_hash in hashes]
+
+
+def test_round_trip_and_reload(tmp_path):
+    store = _DiskStore(str(tmp_path), NAMESPACE)
+    items = items_for([f"text {i}" for i in range(10)])
+    store.append(items)
+    store.append(items[:3])  # Already stored rows are skipped
+
+    reloaded = _DiskStore(str(tmp_path), NAMESPACE)
+    assert reloaded.row_count == 10
+    for text_hash, vector in items:
+        np.testing.assert_array_equal(reloaded.get(text_hash), vector)
+
+
+def test_load_truncates_torn_rows(tmp_path):
+    store = _DiskStore(str(tmp_path), NAMESPACE)
+    items = items_for([f"text {i}" for i in range(5)])
+    store.append(items)
+
+    # An interrupted append: a partial vector row and a half-written index line
+    with open(store.vectors_path, "ab") as f:
+        f.write(np.ones(DIM + 3, dtype=np.float32).tobytes())
+    with open(store.index_path, "ab") as f:
+        f.write(EmbeddingCache.text_hash("torn").encode("ascii")[:20])
+
+    reloaded = _DiskStore(str(tmp_path), NAMESPACE)
+    assert reloaded.row_count == 5
+    assert os.path.getsize(reloaded.vectors_path) == 5 * 4 * DIM
+    assert os.path.getsize(reloaded.index_path) == 5 * 41
+
+    # New rows line up with their index lines again
+    fresh = items_for(["after crash"])
+    reloaded.append(fresh)
+    again = _DiskStore(str(tmp_path), NAMESPACE)
+    for text_hash, vector in items + fresh:
+        np.testing.assert_array_equal(again.get(text_hash), vector)
+
+
+def test_index_lines_without_vectors_are_dropped(tmp_path):
+    store = _DiskStore(str(tmp_path), NAMESPACE)
+    items = items_for([f"text {i}" for i in range(4)])
+    store.append(items)
+    os.truncate(store.vectors_path, 3 * 4 * DIM)
+
+    reloaded = _DiskStore(str(tmp_path), NAMESPACE)
+    assert reloaded.row_count == 3
+    assert reloaded.get(items[3][0]) is None
+    assert os.path.getsize(reloaded.index_path) == 3 * 41
+
+
+def _write_from_process(directory, worker):
+    # Every worker shares half its texts with the others and stores them in small batches
+    store = _DiskStore(directory, NAMESPACE)
+    texts = [f"shared {i}" for i in range(150)] + [f"worker {worker} text {i}" for i in range(150)]
+    items = items_for(texts)
+    for start in range(0, len(items), 7):
+        store.append(items[start:start + 7])
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_concurrent_process_appends_stay_aligned(tmp_path):
+    _DiskStore(str(tmp_path), NAMESPACE)  # Inherited by the forked writers, like a worker pool
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_write_from_process, args=(str(tmp_path), worker)) for worker in range(8)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+        assert process.exitcode == 0
+
+    store = _DiskStore(str(tmp_path), NAMESPACE)
+    texts = [f"shared {i}" for i in range(150)]
+    texts += [f"worker {worker} text {i}" for worker in range(8) for i in range(150)]
+    assert store.row_count == len(texts)
+    for text_hash, vector in items_for(texts):
+        np.testing.assert_array_equal(store.get(text_hash), vector)
+
+
+def test_embedding_cache_serves_disk_hits_after_restart(tmp_path):
+    cache = EmbeddingCache(max_entries=2, path=str(tmp_path))
+    items = items_for(["a", "b", "c"])
+    cache.put_many(NAMESPACE, items)
+
+    restarted = EmbeddingCache(max_entries=2, path=str(tmp_path))
+    for text_hash, vector in items:
+        np.testing.assert_array_equal(restarted.get(NAMESPACE, text_hash), vector)
+    assert restarted.get(NAMESPACE, EmbeddingCache.text_hash("missing")) is None
+    assert restarted.stats()["hits"] == 3 and restarted.stats()["misses"] == 1
@@ -0,0 +1,80 @@
+import csv
+import pytest
+from uraf.exporter import export_records, flatten_record
+
+
+def record(i, evaluation):
+    return {"timestamp": f"2025-01-01T00:00:{i:02d}", "model": "model-a", "agent_type": "planner",
+            "evaluation": evaluation}
+
+
+def read_csv(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_flatten_record_uses_dotted_columns():
+    row = flatten_record(record(0, {"URAF Score": {"Total Score": 7.5, "Structure": 3}, "tags": ["a", "b"]}))
+    assert row == {
+        "timestamp": "2025-01-01T00:00:00", "model": "model-a", "agent_type": "planner", "score": 7.5,
+        "evaluation.URAF Score.Total Score": 7.5, "evaluation.URAF Score.Structure": 3,
+        "evaluation.tags": '["a", "b"]'
+    }
+
+
+def test_csv_keeps_columns_first_seen_in_later_chunks(tmp_path):
+    records = [record(0, {"URAF Score": 5.0}), record(1, {"URAF Score": 6.0}),
+               record(2, {"URAF Score": 7.0, "metrics": {"cached": True}})]
+    path = tmp_path / "results.csv"
+    assert export_records(records, str(path), chunk_size=2) == 3
+
+    rows = read_csv(path)
+    assert list(rows[0]) == ["timestamp", "model", "agent_type", "score",
+                             "evaluation.URAF Score", "evaluation.metrics.cached"]
+    assert [row["evaluation.metrics.cached"] for row in rows] == ["", "", "True"]
+
+
+def test_csv_column_selection(tmp_path):
+    path = tmp_path / "results.csv"
+    export_records([record(0, {"URAF Score": 5.0, "benchmark": "math"})], str(path),
+                   columns=["model", "score", "evaluation.benchmark"])
+    assert read_csv(path) == [{"model": "model-a", "score": "5.0", "evaluation.benchmark": "math"}]
+
+
+def test_empty_export_writes_header(tmp_path):
+    path = tmp_path / "results.csv"
+    assert export_records([], str(path)) == 0
+    assert path.read_text().strip() == "timestamp,model,agent_type,score"
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        export_records([], str(tmp_path / "results.xlsx"))
+
+
+def test_parquet_widens_mixed_columns_and_keeps_late_ones(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    records = [record(0, {"URAF Score": 5.0, "detail": 1.5}), record(1, {"URAF Score": 6, "detail": 2.0}),
+               record(2, {"URAF Score": 7.0, "detail": "n/a", "metrics": {"cached": True}})]
+    path = tmp_path / "results.parquet"
+    assert export_records(records, str(path), chunk_size=2) == 3
+
+    table = pq.read_table(str(path))
+    assert str(table.schema.field("evaluation.URAF Score").type) == "double"
+    assert str(table.schema.field("evaluation.detail").type) == "string"
+    assert str(table.schema.field("evaluation.metrics.cached").type) == "bool"
+    columns = table.to_pydict()
+    assert columns["evaluation.URAF Score"] == [5.0, 6.0, 7.0]
+    assert columns["evaluation.detail"] == ["1.5", "2.0", "n/a"]
+    assert columns["evaluation.metrics.cached"] == [None, None, True]
+
+
+def test_parquet_column_selection_and_empty_export(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "results.parquet"
+    export_records([record(0, {"URAF Score": 5.0})], str(path), columns=["model", "score"])
+    assert pq.read_table(str(path)).to_pydict() == {"model": ["model-a"], "score": [5.0]}
+
+    empty = tmp_path / "empty.parquet"
+    assert export_records([], str(empty)) == 0
+    assert pq.read_table(str(empty)).column_names == ["timestamp", "model", "agent_type", "score"]
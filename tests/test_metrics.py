@@ -0,0 +1,62 @@
+import math
+import pytest
+from uraf.metrics import OfflineBleu, OfflineRouge, corpus_bleu, lcs_length, load_metric, rouge_l, tokenize_13a
+
+
+def test_bleu_matches_hub_metric_example():
+    # Example from the documentation of the `evaluate` "bleu" metric
+    result = corpus_bleu(
+        ["hello there general kenobi", "foo bar foobar"],
+        [["hello there general kenobi", "hello there !"], ["foo bar foobar"]]
+    )
+    assert result["bleu"] == pytest.approx(1.0)
+    assert result["precisions"] == pytest.approx([1.0, 1.0, 1.0, 1.0])
+    assert result["brevity_penalty"] == pytest.approx(1.0)
+    assert result["length_ratio"] == pytest.approx(7 / 6)
+    assert result["translation_length"] == 7
+    assert result["reference_length"] == 6
+
+
+def test_bleu_modified_precisions_and_zero_fourgram():
+    result = corpus_bleu(["the cat sat on the mat"], [["the cat is on the mat"]])
+    assert result["precisions"] == pytest.approx([5 / 6, 3 / 5, 1 / 4, 0.0])
+    assert result["bleu"] == 0.0
+
+
+def test_bleu_smoothing_and_brevity_penalty():
+    result = corpus_bleu(["the cat sat on the mat"], [["the cat is on the mat today"]], smooth=True)
+    precisions = [6 / 7, 4 / 6, 2 / 5, 1 / 4]
+    expected = math.exp(sum(math.log(p) for p in precisions) / 4) * math.exp(1 - 7 / 6)
+    assert result["bleu"] == pytest.approx(expected)
+
+
+def test_13a_tokenization_splits_punctuation():
+    assert tokenize_13a("Hello, world. It's 3.5-4!") == ["Hello", ",", "world", ".", "It's", "3.5", "-", "4", "!"]
+
+
+def test_rouge_l_matches_rouge_score_example():
+    # Example from the rouge_score README: LCS 5, precision 5/8, recall 5/9
+    score = rouge_l("The quick brown dog jumps on the log.", "The quick brown fox jumps over the lazy dog")
+    assert score == pytest.approx(0.5882353)
+
+
+def test_rouge_l_edge_cases():
+    assert rouge_l("identical text here", "Identical, text here!") == pytest.approx(1.0)
+    assert rouge_l("", "anything") == 0.0
+    assert rouge_l("alpha beta", "gamma delta") == 0.0
+    assert lcs_length(list("ABCBDAB"), list("BDCABA")) == 4
+
+
+def test_offline_metrics_follow_evaluate_signatures():
+    rouge = OfflineRouge().compute(predictions=["a b c", "x"], references=[["a c"], ["y"]], use_aggregator=False)
+    assert rouge["rougeL"] == pytest.approx([0.8, 0.0])
+    assert OfflineRouge().compute(predictions=["a b c", "x"], references=["a c", "y"])["rougeL"] == pytest.approx(0.4)
+    assert OfflineBleu().compute(predictions=["a b c d"], references=[["a b c d"]])["bleu"] == pytest.approx(1.0)
+
+
+def test_load_metric_rejects_unknown_names():
+    assert isinstance(load_metric("bleu"), OfflineBleu)
+    with pytest.raises(ValueError):
+        load_metric("meteor")
+    with pytest.raises(ValueError):
+        load_metric("bleu", backend="remote")
@@ -0,0 +1,126 @@
+import asyncio
+import itertools
+from contextlib import aclosing
+import pytest
+from uraf.core import Pipeline, Stage
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def collect(pipeline, items):
+    return [result async for result in pipeline.run(items)]
+
+
+class InFlight:
+    """Stage function that records how many calls overlap."""
+
+    def __init__(self, transform, delay=0.01):
+        self.transform = transform
+        self.delay = delay
+        self.current = 0
+        self.peak = 0
+
+    async def __call__(self, item):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+        try:
+            await asyncio.sleep(self.delay)
+            return self.transform(item)
+        finally:
+            self.current -= 1
+
+
+def test_every_item_passes_through_with_per_stage_concurrency():
+    double = InFlight(lambda x: x * 2)
+    increment = InFlight(lambda x: x + 1)
+    pipeline = Pipeline([Stage("double", double, 4), Stage("increment", increment, 2)])
+
+    results = run(collect(pipeline, range(20)))
+    assert sorted(results) == [x * 2 + 1 for x in range(20)]
+    assert double.peak == 4 and increment.peak == 2
+    assert pipeline.stats == {"double": {"processed": 20, "dropped": 0, "failed": 0},
+                              "increment": {"processed": 20, "dropped": 0, "failed": 0}}
+
+
+def test_single_worker_stages_keep_input_order():
+    pipeline = Pipeline([Stage("a", InFlight(lambda x: x), 1), Stage("b", InFlight(str, delay=0), 1)])
+    assert run(collect(pipeline, range(10))) == [str(x) for x in range(10)]
+
+
+def test_async_iterable_input():
+    async def items():
+        for x in range(5):
+            await asyncio.sleep(0)
+            yield x
+
+    pipeline = Pipeline([Stage("square", InFlight(lambda x: x * x), 2)])
+    assert sorted(run(collect(pipeline, items()))) == [0, 1, 4, 9, 16]
+
+
+def test_none_drops_items():
+    pipeline = Pipeline([Stage("even", InFlight(lambda x: x if x % 2 == 0 else None), 3),
+                         Stage("keep", InFlight(lambda x: x), 1)])
+    assert sorted(run(collect(pipeline, range(10)))) == [0, 2, 4, 6, 8]
+    assert pipeline.stats["even"] == {"processed": 5, "dropped": 5, "failed": 0}
+    assert pipeline.stats["keep"]["processed"] == 5
+
+
+def test_stage_failures_skip_the_item_and_continue():
+    def fragile(x):
+        if x in (3, 7):
+            raise RuntimeError(f"bad item {x}")
+        return x
+
+    pipeline = Pipeline([Stage("fragile", InFlight(fragile), 2), Stage("keep", InFlight(lambda x: x), 1)])
+    assert sorted(run(collect(pipeline, range(10)))) == [0, 1, 2, 4, 5, 6, 8, 9]
+    assert pipeline.stats["fragile"] == {"processed": 8, "dropped": 0, "failed": 2}
+
+
+def test_input_error_surfaces_after_drain():
+    def items():
+        yield from range(5)
+        raise ValueError("broken input")
+
+    pipeline = Pipeline([Stage("keep", InFlight(lambda x: x), 2)])
+    seen = []
+
+    async def consume():
+        async for result in pipeline.run(items()):
+            seen.append(result)
+
+    with pytest.raises(ValueError, match="broken input"):
+        run(consume())
+    # Items read before the error are still processed and delivered
+    assert sorted(seen) == [0, 1, 2, 3, 4]
+
+
+def test_breaking_early_cancels_the_stages():
+    started = []
+    cancelled = []
+
+    async def slow(x):
+        started.append(x)
+        if x == 0:
+            return x
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(x)
+            raise
+        return x
+
+    pipeline = Pipeline([Stage("slow", slow, 3)])
+
+    async def consume():
+        async with aclosing(pipeline.run(itertools.count())) as results:
+            async for result in results:
+                break
+        await asyncio.sleep(0)
+        return result
+
+    assert run(asyncio.wait_for(consume(), timeout=5)) == 0
+    # Only the three workers picked up items, and each blocked one was cancelled
+    assert len(started) == 4
+    assert sorted(cancelled) == sorted(started[1:])
@@ -0,0 +1,124 @@
+import json
+import multiprocessing
+import time
+import pytest
+from uraf.result_store import BufferedResultWriter, JSONLResultStore, SQLiteResultStore
+
+
+def record(i, model="model-a", agent_type="planner", score=5.0):
+    return {"timestamp": f"2025-01-01T00:00:{i % 60:02d}", "model": model, "agent_type": agent_type,
+            "evaluation": {"URAF Score": score, "index": i}}
+
+
+class ListStore:
+    """In-memory store that can be told to fail its next appends."""
+
+    def __init__(self, failures=0):
+        self.batches = []
+        self.failures = failures
+
+    def append(self, records):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk full")
+        self.batches.append(list(records))
+
+
+def _append_from_process(path, worker):
+    store = JSONLResultStore(path)
+    for batch in range(25):
+        store.append([record(worker * 1000 + batch * 4 + i, model=f"worker-{worker}") for i in range(4)])
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_jsonl_appends_from_several_processes_stay_whole(tmp_path):
+    path = str(tmp_path / "results.json")
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_append_from_process, args=(path, worker)) for worker in range(6)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+        assert process.exitcode == 0
+
+    with open(path) as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 6 * 100
+    records = [json.loads(line) for line in lines]
+    for worker in range(6):
+        indexes = sorted(r["evaluation"]["index"] for r in records if r["model"] == f"worker-{worker}")
+        assert indexes == [worker * 1000 + i for i in range(100)]
+
+
+def test_jsonl_append_starts_a_fresh_line_after_a_torn_record(tmp_path):
+    path = tmp_path / "results.json"
+    store = JSONLResultStore(str(path))
+    store.append([record(0)])
+    with open(path, "a") as f:
+        f.write('{"timestamp": "2025-01-01T00:00:01", "model": "mod')
+
+    store.append([record(2)])
+    lines = path.read_text().splitlines()
+    assert len(lines) == 3
+    assert json.loads(lines[2])["evaluation"]["index"] == 2
+    assert [r["evaluation"]["index"] for r in store.iter_query()] == [0, 2]
+
+
+def test_writer_flushes_when_batch_is_full():
+    store = ListStore()
+    flushes = []
+    writer = BufferedResultWriter(store, max_records=3, max_delay=None, on_flush=lambda: flushes.append(1))
+    writer.write(record(0))
+    writer.write(record(1))
+    assert store.batches == []
+    writer.write(record(2))
+    assert [len(batch) for batch in store.batches] == [3]
+    assert flushes == [1]
+
+    writer.write(record(3))
+    writer.close()
+    assert [len(batch) for batch in store.batches] == [3, 1]
+
+
+def test_writer_flushes_after_max_delay():
+    store = ListStore()
+    writer = BufferedResultWriter(store, max_records=100, max_delay=0.1)
+    try:
+        writer.write(record(0))
+        deadline = time.monotonic() + 2
+        while not store.batches and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert [len(batch) for batch in store.batches] == [1]
+    finally:
+        writer.close()
+
+
+def test_writer_keeps_batch_when_flush_fails():
+    store = ListStore(failures=1)
+    flushes = []
+    writer = BufferedResultWriter(store, max_records=2, max_delay=None, on_flush=lambda: flushes.append(1))
+    writer.write(record(0))
+    with pytest.raises(OSError):
+        writer.write(record(1))
+    assert store.batches == [] and flushes == []
+
+    # The failed batch is written first, ahead of newer records
+    writer.write(record(2))
+    writer.flush()
+    assert [r["evaluation"]["index"] for r in store.batches[0]] == [0, 1, 2]
+    assert flushes == [1]
+
+
+def test_sqlite_store_filters_and_tails(tmp_path):
+    store = SQLiteResultStore(str(tmp_path / "results.sqlite"))
+    store.append([record(0), record(1, model="model-b"), record(2, agent_type="critic", score=7.0)])
+    assert [r["evaluation"]["index"] for r in store.iter_query(model="model-a")] == [0, 2]
+    assert [r["evaluation"]["index"] for r in store.iter_query(agent_type="critic")] == [2]
+
+    rows = list(store.tail(0))
+    assert [(model, agent, score) for model, agent, score, _ in rows] == [
+        ("model-a", "planner", 5.0), ("model-b", "planner", 5.0), ("model-a", "critic", 7.0)
+    ]
+    assert rows[-1][3] == store.end_position()
+    assert list(store.tail(store.end_position())) == []
+    store.close()
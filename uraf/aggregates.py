@@ -0,0 +1,235 @@
+import json
+import os
+import threading
+from loguru import logger
+
+
+class P2Quantile:
+    """
+    Streaming quantile estimate using the P² algorithm (Jain & Chlamtac).
+    The first `exact_limit` values are kept and answered exactly; after that the
+    five P² markers are seeded from them and memory stays constant.
+    """
+
+    def __init__(self, p, exact_limit=200):
+        self.p = p
+        self.exact_limit = exact_limit
+        self.values = []
+        self.heights = []
+        self.positions = []
+        self.desired = []
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def _seed_markers(self):
+        values = sorted(self.values)
+        count = len(values)
+        self.desired = [1 + (count - 1) * f for f in self.increments]
+        self.positions = [round(d) for d in self.desired]
+        self.heights = [values[position - 1] for position in self.positions]
+        self.values = []
+
+    def add(self, x):
+        if not self.heights:
+            self.values.append(x)
+            if len(self.values) > self.exact_limit:
+                self._seed_markers()
+            return
+
+        q, n = self.heights, self.positions
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Move the middle markers towards their desired positions
+        for i in range(1, 4):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                candidate = self._parabolic(i, d)
+                if not q[i - 1] < candidate < q[i + 1]:
+                    candidate = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = candidate
+                n[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self):
+        if self.heights:
+            return self.heights[2]
+        if not self.values:
+            return None
+        return sorted(self.values)[round(self.p * (len(self.values) - 1))]
+
+    def to_dict(self):
+        return {
+            "p": self.p, "exact_limit": self.exact_limit, "values": self.values,
+            "heights": self.heights, "positions": self.positions, "desired": self.desired
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        quantile = cls(data["p"], data["exact_limit"])
+        quantile.values = data["values"]
+        quantile.heights = data["heights"]
+        quantile.positions = data["positions"]
+        quantile.desired = data["desired"]
+        return quantile
+
+
+class ScoreAggregate:
+    """
+    Running statistics for one (model, agent type): count, mean and variance
+    (Welford), min/max, streaming p50/p90 and pass rate against a threshold.
+    """
+
+    def __init__(self, threshold=None):
+        self.threshold = threshold
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.passed = 0
+        self.p50 = P2Quantile(0.5)
+        self.p90 = P2Quantile(0.9)
+
+    def add(self, score):
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (score - self.mean)
+        self.min = score if self.min is None else min(self.min, score)
+        self.max = score if self.max is None else max(self.max, score)
+        if self.threshold is not None and score >= self.threshold:
+            self.passed += 1
+        self.p50.add(score)
+        self.p90.add(score)
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "variance": self.m2 / (self.count - 1) if self.count > 1 else 0.0,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.p50.value(),
+            "p90": self.p90.value(),
+            "threshold": self.threshold,
+            "pass_rate": self.passed / self.count if self.threshold is not None and self.count else None
+        }
+
+    def to_dict(self):
+        return {
+            "threshold": self.threshold, "count": self.count, "mean": self.mean, "m2": self.m2,
+            "min": self.min, "max": self.max, "passed": self.passed,
+            "p50": self.p50.to_dict(), "p90": self.p90.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregate = cls(data["threshold"])
+        for key in ("count", "mean", "m2", "min", "max", "passed"):
+            setattr(aggregate, key, data[key])
+        aggregate.p50 = P2Quantile.from_dict(data["p50"])
+        aggregate.p90 = P2Quantile.from_dict(data["p90"])
+        return aggregate
+
+
+class AggregateIndex:
+    """
+    Per-(model, agent type) ScoreAggregates maintained incrementally next to a result store.
+    `position` records how far into the store the aggregates have been folded, so
+    catching up only reads records written since the last update.
+    """
+
+    def __init__(self, thresholds=None):
+        self.thresholds = thresholds or {}
+        self.position = 0
+        self.aggregates = {}
+
+    def add(self, model, agent_type, score):
+        if score is None:
+            return
+        aggregate = self.aggregates.get((model, agent_type))
+        if aggregate is None:
+            aggregate = ScoreAggregate(self.thresholds.get(agent_type))
+            self.aggregates[(model, agent_type)] = aggregate
+        aggregate.add(score)
+
+    def catch_up(self, store):
+        """Folds in every record appended to `store` since the last update. Returns the number added."""
+        if store.end_position() < self.position:
+            logger.warning("⚠️ Result store shrank since aggregates were built; rebuilding summaries")
+            self.position = 0
+            self.aggregates = {}
+
+        added = 0
+        for model, agent_type, score, position in store.tail(self.position):
+            self.add(model, agent_type, score)
+            self.position = position
+            added += 1
+        return added
+
+    def summary(self, model=None, agent_type=None):
+        performance = {}
+        for (model_name, agent), aggregate in sorted(self.aggregates.items()):
+            if (model and model_name != model) or (agent_type and agent != agent_type):
+                continue
+            performance.setdefault(model_name, {})[agent] = aggregate.summary()
+        return performance
+
+    def save(self, path):
+        data = {
+            "thresholds": self.thresholds,
+            "position": self.position,
+            "aggregates": [
+                {"model": model, "agent_type": agent, **aggregate.to_dict()}
+                for (model, agent), aggregate in self.aggregates.items()
+            ]
+        }
+        # Each snapshot is self-consistent up to `position`, so concurrent writers
+        # only need unique temp files; the last rename wins
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, thresholds=None):
+        """
+        Loads persisted aggregates. Starts empty if the file is missing, unreadable
+        or was built against different thresholds.
+        """
+        index = cls(thresholds)
+        if not os.path.exists(path):
+            return index
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            logger.warning(f"⚠️ Could not read aggregate summary {path}; rebuilding")
+            return index
+        if data.get("thresholds") != index.thresholds:
+            logger.info("Readiness thresholds changed; rebuilding aggregate summaries")
+            return index
+
+        index.position = data["position"]
+        for entry in data["aggregates"]:
+            index.aggregates[(entry["model"], entry["agent_type"])] = ScoreAggregate.from_dict(entry)
+        return index
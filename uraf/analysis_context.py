@@ -0,0 +1,82 @@
+import numpy as np
+
+
+def split_sentences(text):
+    """Splits a response into sentences the way the processing stages always have: on '.'."""
+    return [s.strip() for s in text.split(".") if s.strip()]
+
+
+def _normalize(embeddings):
+    return embeddings / np.maximum(np.linalg.norm(embeddings, axis=-1, keepdims=True), 1e-12)
+
+
+class AnalysisContext:
+    """
+    Per-response analysis state shared by summary selection, coherence, keyphrase
+    extraction and topic assignment. The sentences and the whole response are
+    embedded together in one encoder call, on first use.
+    """
+
+    def __init__(self, text, encoder):
+        self.text = text
+        self.sentences = split_sentences(text)
+        self.encoder = encoder
+        self._sentence_embeddings = None
+        self._document_embedding = None
+
+    @classmethod
+    def build_many(cls, texts, encoder):
+        """
+        Builds contexts for many responses with a single encoder call: every response's
+        sentences and the responses themselves are flattened into one batch and the
+        embeddings are sliced back per response by offset.
+        """
+        contexts = [cls(text, encoder) for text in texts]
+        if not contexts:
+            return contexts
+
+        flat, offsets = [], []
+        for context in contexts:
+            offsets.append(len(flat))
+            flat.extend(context.sentences)
+        documents_at = len(flat)
+        flat.extend(texts)
+
+        embeddings = np.asarray(encoder.encode(flat))
+        for i, (context, start) in enumerate(zip(contexts, offsets)):
+            context._sentence_embeddings = embeddings[start:start + len(context.sentences)]
+            context._document_embedding = embeddings[documents_at + i]
+        return contexts
+
+    def _encode(self):
+        embeddings = np.asarray(self.encoder.encode(self.sentences + [self.text]))
+        self._sentence_embeddings = embeddings[:-1]
+        self._document_embedding = embeddings[-1]
+
+    @property
+    def sentence_embeddings(self):
+        if self._sentence_embeddings is None:
+            self._encode()
+        return self._sentence_embeddings
+
+    @property
+    def document_embedding(self):
+        if self._document_embedding is None:
+            self._encode()
+        return self._document_embedding
+
+    @property
+    def summary(self):
+        """The sentence with the highest mean cosine similarity to all sentences."""
+        if not self.sentences:
+            return self.text
+        normalized = _normalize(self.sentence_embeddings)
+        return self.sentences[int((normalized @ normalized.T).mean(axis=1).argmax())]
+
+    @property
+    def coherence(self):
+        """Mean cosine similarity between each sentence and the one that follows it."""
+        if len(self.sentences) < 2:
+            return 1.0  # Perfect coherence for single sentence
+        normalized = _normalize(self.sentence_embeddings)
+        return float(np.einsum("ij,ij->i", normalized[:-1], normalized[1:]).mean())
@@ -85,6 +85,16 @@ class Benchmark:
         """Returns the relevant benchmarks mapped to an agent type."""
         return cls.AGENT_BENCHMARK_MAP.get(agent_type, [])
 
+    @classmethod
+    def iter_questions(cls, agent_type):
+        """
+        Yields every (benchmark, question) pair available for an agent type.
+        Unlike `generate`, this is deterministic and covers the whole question bank.
+        """
+        for benchmark in cls.get_benchmarks_for_agent(agent_type):
+            for question in cls.BENCHMARK_QUESTIONS.get(benchmark, []):
+                yield benchmark, question
+
     @classmethod
     def generate(cls, agent_type):
         """
@@ -54,6 +54,20 @@ class BenchmarkGenerator:
     - Diagnostic: Reveals reasoning quality
     - Bounded: Clear success criteria"""
 
+    GENERATION_PREFIX = """You are an expert in cognitive assessment design.
+
+Response Format:
+*Understanding:* [Context and problem breakdown]
+*Reasoning Pathway:* [Step-by-step solution approach]
+*Final Synthesis:* [Clear, concise answer]
+
+Your response must be:
+1. Clear and unambiguous
+2. Challenging but solvable
+3. Focused on reasoning over recall
+4. Structured with the exact headers shown above
+"""
+
     def __init__(self, model="qwen2.5-7b-instruct-1m", api_url="http://localhost:1234/v1/completions"):
         self.llm = LLMClient(model=model, api_url=api_url)
 
@@ -112,24 +126,13 @@ class BenchmarkGenerator:
                 """
         }
 
-        # Generate question based on agent type
-        prompt = f"""You are an expert in cognitive assessment design.
-
+        # Generate question based on agent type. The fixed instructions come first so every
+        # agent type shares a byte-identical prompt prefix the server can cache.
+        prompt = f"""{self.GENERATION_PREFIX}
 Task: Generate a challenging benchmark question for the {agent_type}.
 
 Requirements:
 {agent_prompts.get(agent_type, "Design a challenging reasoning question.")}
-
-Response Format:
-*Understanding:* [Context and problem breakdown]
-*Reasoning Pathway:* [Step-by-step solution approach]
-*Final Synthesis:* [Clear, concise answer]
-
-Your response must be:
-1. Clear and unambiguous
-2. Challenging but solvable
-3. Focused on reasoning over recall
-4. Structured with the exact headers shown above
 """
 
         logger.info(f"📝 Generating benchmark for {agent_type}...")
@@ -1,16 +1,58 @@
-import json
+import atexit
 import os
+import threading
 from datetime import datetime
+from uraf.aggregates import AggregateIndex
+from uraf.exporter import export_records
+from uraf.result_store import BufferedResultWriter, extract_score, open_result_store
 
 class BenchmarkTracker:
     """
     Tracks LLM benchmark results for agent-based evaluations.
     Stores results and provides comparisons over time.
+    Storage is pluggable: JSON Lines (default) or SQLite for large histories.
+    Per-(model, agent type) aggregates are maintained incrementally and persisted
+    next to the results in `<save_path>.summary.json`.
+    Writes are buffered and flushed in batches of `flush_records`, after
+    `flush_interval` seconds, or on close/interpreter exit.
     """
 
-    def __init__(self, save_path="data/benchmark_results.json"):
+    def __init__(self, save_path="data/benchmark_results.json", backend=None, thresholds=None,
+                 flush_records=100, flush_interval=1.0, fsync=False):
         self.save_path = save_path
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+        self.store = open_result_store(save_path, backend, fsync)
+        self.thresholds = thresholds or {}
+        self.summary_path = f"{save_path}.summary.json"
+        self._aggregates = None
+        self._aggregates_lock = threading.Lock()
+        self.writer = BufferedResultWriter(
+            self.store, max_records=flush_records, max_delay=flush_interval, on_flush=self._update_aggregates
+        )
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @classmethod
+    def from_config(cls, config):
+        """Creates a tracker from the `storage` and `evaluation` sections of a Config."""
+        storage = config.get_storage_settings()
+        try:
+            thresholds = config.get_evaluation_thresholds()
+        except KeyError:
+            thresholds = {}
+        return cls(
+            storage["benchmark_results_path"],
+            storage.get("backend"),
+            thresholds,
+            flush_records=storage["flush_records"],
+            flush_interval=storage["flush_interval"],
+            fsync=storage["fsync"]
+        )
 
     def save_result(self, model_name, agent_type, evaluation):
         """
@@ -23,38 +65,78 @@ class BenchmarkTracker:
             "evaluation": evaluation
         }
 
-        with open(self.save_path, "a") as f:
-            json.dump(result, f)
-            f.write("\n")
+        self.writer.write(result)
 
-    def load_results(self):
+    def flush(self):
+        """Writes buffered results to storage."""
+        self.writer.flush()
+
+    def iter_results(self, model=None, agent_type=None, since=None, until=None):
         """
-        Loads all stored benchmark results.
+        Streams stored benchmark results one record at a time, optionally filtered by
+        model, agent type and timestamp range (`since` inclusive, `until` exclusive).
+        Corrupt or truncated lines are skipped.
         """
-        if not os.path.exists(self.save_path):
-            return []
-
-        with open(self.save_path, "r") as f:
-            return [json.loads(line) for line in f.readlines()]
+        self.flush()
+        return self.store.iter_query(model=model, agent_type=agent_type, since=since, until=until)
 
-    def compare_models(self):
+    def load_results(self, model=None, agent_type=None, since=None, until=None):
         """
-        Generates a summary of how different models perform across agent types.
+        Loads all matching benchmark results into a list. Prefer `iter_results` for large histories.
         """
-        results = self.load_results()
-        performance = {}
+        return list(self.iter_results(model=model, agent_type=agent_type, since=since, until=until))
 
-        for result in results:
-            model = result["model"]
-            agent_type = result["agent_type"]
-            score = result["evaluation"]["URAF Score"]
+    def compare_models(self, model=None, agent_type=None, since=None, until=None):
+        """
+        Generates a summary of how different models perform across agent types:
+        count, mean, variance, min/max, p50/p90 and threshold pass rate.
+
+        Without a date range this reads the maintained aggregates (O(models × agents));
+        `since`/`until` require a filtered scan of the store.
+        """
+        self.flush()
+        if since or until:
+            index = AggregateIndex(self.thresholds)
+            if hasattr(self.store, "scores"):
+                rows = self.store.scores(model=model, agent_type=agent_type, since=since, until=until)
+            else:
+                rows = (
+                    (result["model"], result["agent_type"], extract_score(result["evaluation"]))
+                    for result in self.iter_results(model=model, agent_type=agent_type, since=since, until=until)
+                )
+            for model_name, agent, score in rows:
+                index.add(model_name, agent, score)
+            return index.summary()
 
-            if model not in performance:
-                performance[model] = {}
+        self._update_aggregates()
+        with self._aggregates_lock:
+            return self._aggregates.summary(model=model, agent_type=agent_type)
 
-            if agent_type not in performance[model]:
-                performance[model][agent_type] = []
+    def export_results(self, path=None, format="csv", columns=None, chunk_size=10000,
+                       model=None, agent_type=None, since=None, until=None):
+        """
+        Streams (optionally filtered) results to a CSV or Parquet file with nested
+        evaluation fields flattened into columns. Defaults to `<save_path stem>.<format>`.
+        Returns the output path.
+        """
+        path = path or f"{os.path.splitext(self.save_path)[0]}.{format}"
+        records = self.iter_results(model=model, agent_type=agent_type, since=since, until=until)
+        export_records(records, path, format=format, columns=columns, chunk_size=chunk_size)
+        return path
 
-            performance[model][agent_type].append(score)
+    def _update_aggregates(self):
+        """Loads the persisted aggregates and folds in any records written since."""
+        with self._aggregates_lock:
+            if self._aggregates is None:
+                self._aggregates = AggregateIndex.load(self.summary_path, self.thresholds)
+            if self._aggregates.catch_up(self.store):
+                self._aggregates.save(self.summary_path)
 
-        return performance
+    def close(self):
+        """Flushes buffered results and closes the underlying storage backend."""
+        if self.writer is None:
+            return
+        self.writer.close()
+        self.writer = None
+        self.store.close()
+        atexit.unregister(self.close)
@@ -1,37 +1,158 @@
 import argparse
-import asyncio
-from uraf.evaluate_agents import run_evaluation
-from uraf.benchmark_tracker import BenchmarkTracker
-from uraf.config_loader import Config
+import os
+import sys
+
+# Heavy ML dependencies (torch, sentence-transformers, evaluate, guidance, ...) are only
+# imported by the `run` and `sweep` handlers, so history/compare/export start instantly.
+
+LEGACY_FLAGS = {
+    "--run": "run",
+    "--sweep": "sweep",
+    "--history": "history",
+    "--compare": "compare",
+    "--export": "export"
+}
 
-def main():
-    parser = argparse.ArgumentParser(description="URAF Command-Line Interface")
-    parser.add_argument("--run", action="store_true", help="Run an agent evaluation")
-    parser.add_argument("--config", type=str, help="Specify a model-specific config file")
-    parser.add_argument("--history", action="store_true", help="Show evaluation history")
-    parser.add_argument("--compare", action="store_true", help="Compare model performances")
-    parser.add_argument("--export", action="store_true", help="Export results to CSV")
 
-    args = parser.parse_args()
-    tracker = BenchmarkTracker()
+def _load_config(args):
+    from uraf.config_loader import Config
 
     if args.config:
-        config = Config(config_path=f"{args.config}")  # Load model-specific config
-    else:
-        config = Config()  # Load default config.yaml
-
-    if args.run:
-        asyncio.run(run_evaluation(config))  # ✅ Properly await async function
-    elif args.history:
-        history = tracker.load_results()
-        for record in history:
-            print(f"Model: {record['model']}, Agent: {record['agent_type']}, Score: {record['evaluation']['URAF Score']}")
-    elif args.compare:
-        print("Performance Summary:", tracker.compare_models())
-    elif args.export:
-        tracker.export_results()
-    else:
+        return Config(config_path=f"{args.config}")  # Load model-specific config
+    return Config()  # Load default config.yaml
+
+
+def _open_tracker(args):
+    from uraf.benchmark_tracker import BenchmarkTracker
+
+    return BenchmarkTracker.from_config(_load_config(args))
+
+
+def _filters(args):
+    return {"model": args.model, "agent_type": args.agent, "since": args.since, "until": args.until}
+
+
+def cmd_run(args):
+    import asyncio
+    from uraf.evaluate_agents import run_evaluation
+
+    asyncio.run(run_evaluation(_load_config(args)))  # ✅ Properly await async function
+
+
+def cmd_sweep(args):
+    import asyncio
+    from uraf.evaluate_agents import run_sweep
+
+    asyncio.run(run_sweep(
+        _load_config(args),
+        repetitions=args.repetitions,
+        concurrency=args.concurrency,
+        requests_per_second=args.rps,
+        tokens_per_second=args.tps,
+        stream=args.stream,
+        pool_kind=args.pool,
+        workers=args.workers,
+        process_responses=args.process,
+        cache_mode=args.cache
+    ))
+
+
+def cmd_history(args):
+    from uraf.result_store import extract_score
+
+    with _open_tracker(args) as tracker:
+        for record in tracker.iter_results(**_filters(args)):
+            print(f"Model: {record['model']}, Agent: {record['agent_type']}, Score: {extract_score(record['evaluation'])}")
+
+
+def cmd_compare(args):
+    with _open_tracker(args) as tracker:
+        summary = tracker.compare_models(**_filters(args))
+
+    print("Performance Summary:")
+    for model, agents in summary.items():
+        print(f"Model: {model}")
+        for agent, stats in agents.items():
+            pass_rate = "n/a" if stats["pass_rate"] is None else f"{stats['pass_rate']:.0%}"
+            print(
+                f"  {agent}: n={stats['count']}, mean={stats['mean']:.2f}, var={stats['variance']:.2f}, "
+                f"min={stats['min']:.2f}, max={stats['max']:.2f}, p50={stats['p50']:.2f}, "
+                f"p90={stats['p90']:.2f}, pass={pass_rate}"
+            )
+
+
+def cmd_export(args):
+    path = args.path or None
+    export_format = args.format or (os.path.splitext(path)[1].lstrip(".") if path else "") or "csv"
+    columns = args.columns.split(",") if args.columns else None
+
+    with _open_tracker(args) as tracker:
+        path = tracker.export_results(path, format=export_format, columns=columns, **_filters(args))
+    print(f"Exported results to {path}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="URAF Command-Line Interface")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", type=str, help="Specify a model-specific config file")
+
+    filters = argparse.ArgumentParser(add_help=False)
+    filters.add_argument("--model", type=str, help="Only include results for this model")
+    filters.add_argument("--agent", type=str, help="Only include results for this agent type")
+    filters.add_argument("--since", type=str, help="Only include results at or after this ISO timestamp")
+    filters.add_argument("--until", type=str, help="Only include results before this ISO timestamp")
+
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    run = commands.add_parser("run", parents=[common], help="Run an agent evaluation")
+    run.set_defaults(handler=cmd_run)
+
+    sweep = commands.add_parser("sweep", parents=[common], help="Evaluate every agent type on every benchmark question")
+    sweep.add_argument("--repetitions", type=int, default=1, help="Number of times each sweep question is asked")
+    sweep.add_argument("--concurrency", type=int, default=8, help="Maximum in-flight LLM requests during a sweep")
+    sweep.add_argument("--rps", type=float, help="Requests-per-second budget during a sweep")
+    sweep.add_argument("--tps", type=float, help="Tokens-per-second budget during a sweep")
+    sweep.add_argument("--stream", action="store_true", help="Stream completions during a sweep and abort malformed ones early")
+    sweep.add_argument("--pool", choices=["thread", "process"], default="thread", help="Worker pool used for scoring during a sweep")
+    sweep.add_argument("--workers", type=int, help="Number of scoring workers during a sweep")
+    sweep.add_argument("--process", action="store_true", help="Also run ResponseProcessor on each sweep response")
+    sweep.add_argument("--cache", choices=["read_write", "read", "write", "bypass"],
+                       help="Completion cache mode (default: the config's cache section)")
+    sweep.set_defaults(handler=cmd_sweep)
+
+    history = commands.add_parser("history", parents=[common, filters], help="Show evaluation history")
+    history.set_defaults(handler=cmd_history)
+
+    compare = commands.add_parser("compare", parents=[common, filters], help="Compare model performances")
+    compare.set_defaults(handler=cmd_compare)
+
+    export = commands.add_parser("export", parents=[common, filters], help="Export results to CSV/Parquet")
+    export.add_argument("path", nargs="?", help="Output file (default: next to the results file)")
+    export.add_argument("--format", choices=["csv", "parquet"], help="Export file format (default: from PATH extension, else csv)")
+    export.add_argument("--columns", type=str, help="Comma-separated columns to export")
+    export.set_defaults(handler=cmd_export)
+
+    return parser
+
+
+def translate_legacy_args(argv):
+    """Maps the old flag style (`--history`, `--export [PATH]`, ...) onto subcommands."""
+    for index, arg in enumerate(argv):
+        if arg in LEGACY_FLAGS:
+            return [LEGACY_FLAGS[arg]] + argv[:index] + argv[index + 1:]
+    return argv
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    args = parser.parse_args(translate_legacy_args(list(argv)))
+
+    if not args.command:
         parser.print_help()
+        return
+    args.handler(args)
 
 if __name__ == "__main__":
     main()
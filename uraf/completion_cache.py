@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from loguru import logger
+
+# read_write: serve hits and store misses; read: serve hits, never store;
+# write: always query the LLM and refresh stored entries; bypass: ignore the cache
+CACHE_MODES = ("read_write", "read", "write", "bypass")
+
+
+class CompletionCache:
+    """
+    On-disk cache of LLM completions keyed by model, endpoint, sampling parameters
+    and the rendered prompt. Stored in SQLite; once the stored completions exceed
+    `max_bytes`, the least recently used entries are evicted.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS completions (
+            key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            accessed REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_completions_accessed ON completions (accessed);
+    """
+
+    def __init__(self, path="data/completion_cache.sqlite", max_bytes=512 * 1024 * 1024, mode="read_write"):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode {mode!r}; expected one of {CACHE_MODES}")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection.executescript(self.SCHEMA)
+        self._size = self._stored_bytes()
+
+    @property
+    def connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._connections.append(connection)
+        return connection
+
+    @property
+    def readable(self):
+        return self.mode in ("read_write", "read")
+
+    @property
+    def writable(self):
+        return self.mode in ("read_write", "write")
+
+    @staticmethod
+    def make_key(model, api_url, prompt, **params):
+        """Hashes everything that determines a completion into a stable cache key."""
+        payload = json.dumps({"model": model, "api_url": api_url, "prompt": prompt, "params": params},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Returns the cached response for `key`, or None on a miss or when reads are disabled."""
+        if not self.readable:
+            return None
+        row = self.connection.execute("SELECT response FROM completions WHERE key = ?", (key,)).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if row is None:
+            return None
+        with self.connection:
+            self.connection.execute("UPDATE completions SET accessed = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, response):
+        """Stores a response, evicting least recently used entries if the cache is over budget."""
+        if not self.writable:
+            return
+        payload = json.dumps(response, ensure_ascii=False)
+        with self.connection:
+            row = self.connection.execute("SELECT size FROM completions WHERE key = ?", (key,)).fetchone()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO completions (key, response, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time())
+            )
+        with self._lock:
+            # A replaced entry frees its old size
+            self._size += len(payload) - (row[0] if row else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    async def aget(self, key):
+        """Runs `get` in the default executor so SQLite I/O does not block the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.get, key)
+
+    async def aput(self, key, response):
+        """Runs `put` in the default executor so SQLite I/O does not block the event loop."""
+        await asyncio.get_running_loop().run_in_executor(None, self.put, key, response)
+
+    def _stored_bytes(self):
+        return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+
+    def _evict(self):
+        """Deletes the least recently used entries until the cache is at 90% of its budget."""
+        self._size = self._stored_bytes()
+        target = int(self.max_bytes * 0.9)
+        if self._size <= target:
+            return
+
+        evicted = 0
+        rows = self.connection.execute("SELECT key, size FROM completions ORDER BY accessed, rowid").fetchall()
+        keys = []
+        for key, size in rows:
+            if self._size <= target:
+                break
+            keys.append((key,))
+            self._size -= size
+            evicted += 1
+        with self.connection:
+            self.connection.executemany("DELETE FROM completions WHERE key = ?", keys)
+        logger.info(f"🧹 Evicted {evicted} cached completions ({self._size} bytes kept)")
+
+    def stats(self):
+        return {"mode": self.mode, "hits": self.hits, "misses": self.misses, "bytes": self._size}
+
+    def close(self):
+        for connection in self._connections:
+            connection.close()
+        self._connections = []
+        self._local = threading.local()
@@ -1,10 +1,18 @@
 import yaml
 import os
 from loguru import logger
-from dotenv import load_dotenv
 
-# Load environment variables from .env
-load_dotenv()
+_environment_loaded = False
+
+
+def _load_environment():
+    """Loads environment variables from .env once, on first Config use rather than at import."""
+    global _environment_loaded
+    if not _environment_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _environment_loaded = True
+
 
 class Config:
     """
@@ -12,6 +20,7 @@ class Config:
     """
 
     def __init__(self, config_path="examples/config.yaml"):
+        _load_environment()
         logger.info(f"Loading configuration from {config_path}")
         with open(config_path, "r") as file:
             self.config = yaml.safe_load(file)
@@ -34,6 +43,47 @@ class Config:
         logger.info(f"Loaded LLM settings: {llm_settings}")
         return llm_settings
 
+    def get_storage_settings(self):
+        """
+        Returns storage settings: `benchmark_results_path`, an optional `backend`
+        ("jsonl" or "sqlite", inferred from the file extension when omitted) and
+        write batching (`flush_records`, `flush_interval` seconds, `fsync`).
+        """
+        storage = (self.config or {}).get("storage") or {}
+        return {
+            "benchmark_results_path": storage.get("benchmark_results_path", "data/benchmark_results.json"),
+            "backend": storage.get("backend"),
+            "flush_records": storage.get("flush_records", 100),
+            "flush_interval": storage.get("flush_interval", 1.0),
+            "fsync": storage.get("fsync", False)
+        }
+
+    def get_cache_settings(self):
+        """
+        Returns completion cache settings: `enabled`, `path`, `max_size_mb` and `mode`
+        ("read_write", "read", "write" or "bypass").
+        """
+        cache = (self.config or {}).get("cache") or {}
+        return {
+            "enabled": cache.get("enabled", False),
+            "path": cache.get("path", "data/completion_cache.sqlite"),
+            "max_size_mb": cache.get("max_size_mb", 512),
+            "mode": cache.get("mode", "read_write")
+        }
+
+    def get_topic_settings(self):
+        """
+        Returns topic modeling settings: `model_path`, the directory the fitted topics are
+        saved to after a processed sweep and loaded from for per-response assignment, and
+        `online` / `n_clusters` for the incrementally updated clustering backend.
+        """
+        topics = (self.config or {}).get("topics") or {}
+        return {
+            "model_path": topics.get("model_path", "data/topic_model"),
+            "online": topics.get("online", False),
+            "n_clusters": topics.get("n_clusters", 20)
+        }
+
     def get_evaluation_thresholds(self):
         """Returns evaluation readiness thresholds."""
         if "evaluation" in self.config and "readiness_thresholds" in self.config["evaluation"]:
@@ -1,32 +1,188 @@
+import asyncio
+from loguru import logger
 from uraf.llm_client import LLMClient
 from uraf.response_processor import ResponseProcessor
-from uraf.evaluator import Evaluator
+from uraf.evaluator import LLMResponseEvaluator
+from uraf.worker_pool import get_default_pool
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a Pipeline: an async function applied to every item,
+    run by `concurrency` workers. Returning None drops the item.
+    """
+
+    def __init__(self, name, fn, concurrency=1):
+        self.name = name
+        self.fn = fn
+        self.concurrency = concurrency
+
+
+class Pipeline:
+    """
+    Asyncio pipeline that connects stages with bounded queues.
+    - Every stage works concurrently with the others, so throughput is bounded by
+      the slowest stage rather than the sum of all stages
+    - A full queue blocks the stage feeding it, so memory stays flat on large inputs
+    """
+
+    def __init__(self, stages, queue_size=None):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stats = {stage.name: {"processed": 0, "dropped": 0, "failed": 0} for stage in stages}
+
+    def _queue_for(self, stage):
+        return asyncio.Queue(maxsize=self.queue_size or 2 * stage.concurrency)
+
+    async def run(self, items):
+        """
+        Pushes `items` (iterable or async iterable) through all stages and
+        yields the outputs of the final stage as they become available.
+        """
+        inboxes = [self._queue_for(stage) for stage in self.stages]
+        output = asyncio.Queue(maxsize=self.queue_size or 2 * self.stages[-1].concurrency)
+        outboxes = inboxes[1:] + [output]
+
+        async def feed():
+            try:
+                if hasattr(items, "__aiter__"):
+                    async for item in items:
+                        await inboxes[0].put(item)
+                else:
+                    for item in items:
+                        await inboxes[0].put(item)
+            finally:
+                for _ in range(self.stages[0].concurrency):
+                    await inboxes[0].put(_DONE)
+
+        async def work(stage, inbox, outbox):
+            stats = self.stats[stage.name]
+            while True:
+                item = await inbox.get()
+                if item is _DONE:
+                    return
+                try:
+                    result = await stage.fn(item)
+                except Exception as e:
+                    stats["failed"] += 1
+                    logger.error(f"❌ Pipeline stage '{stage.name}' failed: {str(e)}")
+                    continue
+                if result is None:
+                    stats["dropped"] += 1
+                    continue
+                stats["processed"] += 1
+                await outbox.put(result)
+
+        async def run_stage(index, stage):
+            await asyncio.gather(*(work(stage, inboxes[index], outboxes[index]) for _ in range(stage.concurrency)))
+            # Release the next stage's workers (or the consumer) once this stage is drained
+            downstream = self.stages[index + 1].concurrency if index + 1 < len(self.stages) else 1
+            for _ in range(downstream):
+                await outboxes[index].put(_DONE)
+
+        tasks = [asyncio.create_task(feed())]
+        tasks += [asyncio.create_task(run_stage(index, stage)) for index, stage in enumerate(self.stages)]
+        try:
+            while True:
+                result = await output.get()
+                if result is _DONE:
+                    break
+                yield result
+            # Surface errors raised while reading the input items
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
 
 class URAF:
     """
     Unified Reasoning and Aggregation Framework (URAF)
     - High-level abstraction for executing LLM evaluation pipelines.
+    - One client, processor and evaluator are reused across calls.
     """
 
-    def __init__(self, model="openai/gpt-4", api_url="http://localhost:1234/v1/completions"):
-        self.llm = LLMClient(model=model, api_url=api_url)
-        self.processor = ResponseProcessor()
-        self.evaluator = Evaluator()
+    def __init__(self, model="openai/gpt-4", api_url="http://localhost:1234/v1/completions",
+                 llm=None, processor=None, evaluator=None, pool=None):
+        self.pool = pool or get_default_pool()
+        self.llm = llm or LLMClient(model=model, api_url=api_url)
+        self.processor = processor or ResponseProcessor(pool=self.pool)
+        self.evaluator = evaluator or LLMResponseEvaluator(pool=self.pool)
 
-    def run(self, prompt):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """Releases the LLM client's pooled connections."""
+        await self.llm.close()
+
+    async def arun(self, prompt, technique=None):
         """
         Executes the URAF evaluation pipeline:
         1. Sends prompt to LLM
         2. Processes the LLM response
         3. Evaluates response using structured reasoning
         """
-        raw_response = self.llm.query(prompt)
-        processed_response = self.processor.process(raw_response)
-        evaluation_result = self.evaluator.evaluate(processed_response)
+        result = await self._generate({"prompt": prompt, "technique": technique})
+        result = await self._process(result)
+        return await self._evaluate(result)
+
+    async def arun_many(self, prompts, concurrency=8, technique=None):
+        """
+        Runs the evaluation pipeline for many prompts concurrently.
+        At most `concurrency` LLM requests are in flight while earlier responses are
+        processed and scored. Results are returned in prompt order.
+        """
+        prompts = list(prompts)
+        pipeline = Pipeline([
+            Stage("generate", self._generate, concurrency),
+            # Processing keeps history and topic state, so responses go through it one at a time
+            Stage("process", self._process, 1),
+            Stage("evaluate", self._evaluate, self.pool.max_workers)
+        ])
+        items = ({"index": index, "prompt": prompt, "technique": technique} for index, prompt in enumerate(prompts))
+
+        results = [None] * len(prompts)
+        async for result in pipeline.run(items):
+            results[result.pop("index")] = result
+        return results
+
+    def run(self, prompt, technique=None):
+        """Synchronous wrapper around `arun`."""
+        return asyncio.run(self._run_and_close(self.arun(prompt, technique)))
 
+    def run_many(self, prompts, concurrency=8, technique=None):
+        """Synchronous wrapper around `arun_many`."""
+        return asyncio.run(self._run_and_close(self.arun_many(prompts, concurrency, technique)))
+
+    async def _run_and_close(self, coro):
+        # The HTTP session is bound to the event loop that asyncio.run is about to close
+        try:
+            return await coro
+        finally:
+            await self.aclose()
+
+    async def _generate(self, item):
+        raw_response = await self.llm.query(item["prompt"], item.get("technique"))
         return {
-            "prompt": prompt,
+            **item,
             "raw_response": raw_response,
-            "processed_response": processed_response,
-            "evaluation_result": evaluation_result
+            "processed_response": None,
+            "evaluation_result": None
         }
+
+    async def _process(self, item):
+        if item["raw_response"]:
+            item["processed_response"] = await self.processor.aprocess(item["raw_response"]["summary"])
+        return item
+
+    async def _evaluate(self, item):
+        if item["raw_response"]:
+            item["evaluation_result"] = (await self.evaluator.evaluate_batch([item["raw_response"]["summary"]]))[0]
+        item.pop("technique", None)
+        return item
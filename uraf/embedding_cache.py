@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single-writer use only
+    fcntl = None
+
+
+class EmbeddingCache:
+    """
+    Content-addressed cache of text embeddings keyed by (model, text hash).
+    Keeps the most recently used vectors in an in-memory LRU and, when a path is
+    given, persists every vector to an append-only memory-mapped store on disk.
+    """
+
+    def __init__(self, max_entries=50000, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._stores = {}
+        self._lock = threading.Lock()
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def text_hash(text):
+        """Returns the content hash used as the cache key for a text."""
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def get(self, namespace, text_hash):
+        """Returns the cached vector or None."""
+        key = (namespace, text_hash)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return vector
+
+            store = self._get_store(namespace)
+            vector = store.get(text_hash) if store else None
+            if vector is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._remember(key, vector)
+            return vector
+
+    def put_many(self, namespace, items):
+        """Stores (text_hash, vector) pairs in memory and, if enabled, on disk."""
+        with self._lock:
+            for text_hash, vector in items:
+                self._remember((namespace, text_hash), vector)
+            store = self._get_store(namespace)
+            if store:
+                store.append(items)
+
+    def stats(self):
+        """Returns hit/miss counters and the current in-memory size."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._memory)}
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _get_store(self, namespace):
+        if not self.path:
+            return None
+        store = self._stores.get(namespace)
+        if store is None:
+            store = _DiskStore(self.path, namespace)
+            self._stores[namespace] = store
+        return store
+
+
+class _DiskStore:
+    """
+    Append-only vector file for one namespace:
+    `<name>.f32` holds raw float32 rows, `<name>.idx` one text hash per row,
+    and `<name>.json` the vector dimension. Rows are read through np.memmap.
+    Appends hold an exclusive lock on `<name>.lock`, so forked workers can share a store.
+    """
+
+    def __init__(self, directory, namespace):
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", namespace)
+        self.vectors_path = os.path.join(directory, f"{slug}.f32")
+        self.index_path = os.path.join(directory, f"{slug}.idx")
+        self.meta_path = os.path.join(directory, f"{slug}.json")
+        self.lock_path = os.path.join(directory, f"{slug}.lock")
+        self.dim = None
+        self.rows = {}
+        self.row_count = 0  # Physical rows in the vector file
+        self._index_bytes = 0  # Bytes of the index file already read into `rows`
+        self._mmap = None
+        self._load()
+
+    @contextmanager
+    def _locked(self):
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _load(self):
+        with self._locked():
+            self._catch_up()
+        logger.info(f"💾 Loaded {len(self.rows)} cached embeddings from {self.vectors_path}")
+
+    def _catch_up(self):
+        """
+        Reads index lines written since the last call (by this or another process) and
+        drops rows left behind by an interrupted append. Must be called under the lock.
+        """
+        if self.dim is None:
+            if not os.path.exists(self.meta_path):
+                # Without a dimension nothing on disk can be trusted
+                for path in (self.vectors_path, self.index_path):
+                    if os.path.exists(path):
+                        os.truncate(path, 0)
+                return
+            with open(self.meta_path, "r") as f:
+                self.dim = json.load(f)["dim"]
+
+        # Vectors are written before their index lines, so any index line has a complete row
+        row_bytes = 4 * self.dim
+        complete_rows = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                f.seek(self._index_bytes)
+                for line in f:
+                    if self.row_count >= complete_rows or len(line) != 41 or not line.endswith(b"\n"):
+                        break
+                    self.rows.setdefault(line[:40].decode("ascii", "replace"), self.row_count)
+                    self.row_count += 1
+                    self._index_bytes += len(line)
+
+        # Truncate torn tails so the next rows line up with their index lines
+        if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) != self.row_count * row_bytes:
+            os.truncate(self.vectors_path, self.row_count * row_bytes)
+        if os.path.exists(self.index_path) and os.path.getsize(self.index_path) != self._index_bytes:
+            os.truncate(self.index_path, self._index_bytes)
+
+    def get(self, text_hash):
+        row = self.rows.get(text_hash)
+        if row is None:
+            return None
+        if self._mmap is None or row >= self._mmap.shape[0]:
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                   shape=(self.row_count, self.dim))
+        return np.array(self._mmap[row])
+
+    def append(self, items):
+        with self._locked():
+            # Other processes may have appended since we last looked
+            self._catch_up()
+            items = [(text_hash, vector) for text_hash, vector in items if text_hash not in self.rows]
+            if not items:
+                return
+            if self.dim is None:
+                self.dim = int(items[0][1].shape[-1])
+                with open(self.meta_path, "w") as f:
+                    json.dump({"dim": self.dim}, f)
+
+            block = np.stack([vector for _, vector in items]).astype(np.float32)
+            with open(self.vectors_path, "ab") as f:
+                f.write(block.tobytes())
+            payload = "".join(f"{text_hash}\n" for text_hash, _ in items).encode("ascii")
+            with open(self.index_path, "ab") as f:
+                f.write(payload)
+
+            start = self.row_count
+            for offset, (text_hash, _) in enumerate(items):
+                self.rows[text_hash] = start + offset
+            self.row_count += len(items)
+            self._index_bytes += len(payload)
+
+
+class CachedEncoder:
+    """
+    Drop-in wrapper around `SentenceTransformer.encode` that serves repeated
+    texts from an EmbeddingCache and only runs the model on unseen texts.
+    """
+
+    def __init__(self, model, model_name, cache):
+        self.model = model
+        self.model_name = model_name
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def encode(self, sentences, convert_to_tensor=False, normalize_embeddings=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return self.model.encode(texts, convert_to_tensor=convert_to_tensor,
+                                     normalize_embeddings=normalize_embeddings, **kwargs)
+
+        namespace = f"{self.model_name}-normalized" if normalize_embeddings else self.model_name
+        hashes = [EmbeddingCache.text_hash(text) for text in texts]
+        vectors = [self.cache.get(namespace, text_hash) for text_hash in hashes]
+
+        # Encode each distinct missing text once
+        missing = OrderedDict()
+        for text, text_hash, vector in zip(texts, hashes, vectors):
+            if vector is None:
+                missing.setdefault(text_hash, text)
+
+        if missing:
+            encoded = self.model.encode(list(missing.values()), convert_to_numpy=True,
+                                        normalize_embeddings=normalize_embeddings, **kwargs)
+            fresh = dict(zip(missing.keys(), encoded.astype(np.float32)))
+            self.cache.put_many(namespace, list(fresh.items()))
+            vectors = [fresh[text_hash] if vector is None else vector
+                       for text_hash, vector in zip(hashes, vectors)]
+
+        embeddings = np.stack(vectors)
+        if convert_to_tensor:
+            import torch
+            embeddings = torch.from_numpy(embeddings).to(self.model.device)
+        return embeddings[0] if single else embeddings
@@ -3,11 +3,15 @@ from tqdm.asyncio import tqdm
 from loguru import logger
 from uraf.benchmark import Benchmark
 from uraf.benchmark_generator import BenchmarkGenerator
-from uraf.llm_client import LLMClient
+from uraf.core import Pipeline, Stage
+from uraf.completion_cache import CompletionCache
+from uraf.llm_client import LLMClient, RequestThrottle
 from uraf.evaluator import LLMResponseEvaluator
+from uraf.response_processor import ResponseProcessor
 from uraf.benchmark_tracker import BenchmarkTracker
 from uraf.config_loader import Config
 from uraf.prompt_manager import PromptManager
+from uraf.worker_pool import WorkerPool
 
 
 async def run_evaluation(config):
@@ -17,7 +21,6 @@ async def run_evaluation(config):
     llm_settings = config.get_llm_settings()
     llm = LLMClient(model=llm_settings["model"], api_url=llm_settings["api_url"])
     evaluator = LLMResponseEvaluator()
-    tracker = BenchmarkTracker()
 
     # Select an agent type
     agent_types = list(Benchmark.get_agent_types())
@@ -45,18 +48,158 @@ async def run_evaluation(config):
     formatted_prompt = PromptManager.get_prompt_with_technique(benchmark_question, technique)
 
     # 🔹 Query the LLM
-    response = await llm.query(formatted_prompt)
+    async with llm:
+        response = await llm.query(formatted_prompt)
     logger.info(f"🔍 Raw LLM Response: {response}")
 
     # 🔹 Evaluate response
     evaluation = await evaluator.evaluate_response(response["summary"])
 
-    # 🔹 Store results in BenchmarkTracker
-    tracker.save_result(llm_settings["model"], agent_type, evaluation)
+    # 🔹 Store results in the configured result store
+    with BenchmarkTracker.from_config(config) as tracker:
+        tracker.save_result(llm_settings["model"], agent_type, evaluation)
 
     print(f"\n✅ Benchmark Question: {benchmark_question}\n🔍 Evaluation: {evaluation}\n")
 
 
+def build_sweep_jobs(repetitions=1):
+    """
+    Expands every agent type × benchmark question × repetition into a flat job list.
+    Jobs are grouped by technique so prompts with a shared prefix are sent back to back,
+    which lets prefix-caching servers reuse their KV cache.
+    """
+    jobs = []
+    for agent_type in Benchmark.AGENT_BENCHMARK_MAP:
+        technique = Benchmark.get_technique_for_agent(agent_type)
+        for benchmark, question in Benchmark.iter_questions(agent_type):
+            for repetition in range(repetitions):
+                jobs.append({
+                    "agent_type": agent_type,
+                    "benchmark": benchmark,
+                    "question": question,
+                    "technique": technique,
+                    "repetition": repetition
+                })
+    order = PromptManager.group_by_technique([job["technique"] for job in jobs])
+    return [jobs[index] for index in order]
+
+
+def open_completion_cache(config, mode=None):
+    """
+    Opens the completion cache described by the config's `cache` section.
+    An explicit `mode` enables the cache regardless of `cache.enabled`; "bypass" disables it.
+    """
+    settings = config.get_cache_settings()
+    if mode is None:
+        if not settings["enabled"]:
+            return None
+        mode = settings["mode"]
+    if mode == "bypass":
+        return None
+    return CompletionCache(settings["path"], max_bytes=int(settings["max_size_mb"] * 1024 * 1024), mode=mode)
+
+
+async def run_sweep(config, repetitions=1, concurrency=8, requests_per_second=None, tokens_per_second=None,
+                    stream=False, pool_kind="thread", workers=None, process_responses=False, cache_mode=None):
+    """
+    Runs every benchmark question for every agent type without user interaction.
+
+    Jobs flow through a pipeline of generate → (process) → evaluate → persist stages
+    connected by bounded queues:
+    - generate: at most `concurrency` requests in flight, optionally paced to a
+      request/token budget; with `stream`, malformed completions are aborted early
+    - process/evaluate: `workers` concurrent calls into a `pool_kind` worker pool
+    - persist: results are saved to BenchmarkTracker as they complete
+
+    With the completion cache enabled in the config (or `cache_mode` given), validated
+    completions are reused across sweeps, so only scoring is re-run.
+    """
+    llm_settings = config.get_llm_settings()
+    cache = open_completion_cache(config, cache_mode)
+    llm = LLMClient(model=llm_settings["model"], api_url=llm_settings["api_url"], stream=stream, cache=cache)
+    throttle = RequestThrottle(concurrency, requests_per_second, tokens_per_second)
+    pool = WorkerPool(kind=pool_kind, max_workers=workers)
+    evaluator = LLMResponseEvaluator(pool=pool)
+    topic_settings = config.get_topic_settings()
+    processor = ResponseProcessor(
+        pool=pool,
+        topic_model_path=topic_settings["model_path"],
+        online_topics=topic_settings["online"],
+        topic_clusters=topic_settings["n_clusters"]
+    ) if process_responses else None
+    processed_texts = []
+    tracker = BenchmarkTracker.from_config(config)
+
+    async def generate(job):
+        response = await llm.throttled_query(throttle, job["question"], job["technique"], sample=job["repetition"])
+        if not response:
+            logger.warning(f"⚠️ No response for '{job['agent_type']}' on: {job['question']}")
+            return None
+        return {**job, "response": response}
+
+    async def process(job):
+        processed_texts.append(job["response"]["summary"])
+        return {**job, "processed": await processor.aprocess(job["response"]["summary"])}
+
+    async def evaluate(job):
+        scores = (await evaluator.evaluate_batch([job["response"]["summary"]]))[0]
+        return {**job, "scores": scores}
+
+    async def persist(job):
+        tracker.save_result(llm_settings["model"], job["agent_type"], {
+            "URAF Score": job["scores"]["final_score"],
+            "scores": job["scores"],
+            "benchmark": job["benchmark"],
+            "question": job["question"],
+            "repetition": job["repetition"],
+            "metrics": job["response"].get("metrics")
+        })
+        return job
+
+    stages = [Stage("generate", generate, concurrency)]
+    if processor:
+        # Processing keeps history and topic state, so responses go through it one at a time
+        stages.append(Stage("process", process, 1))
+    stages += [Stage("evaluate", evaluate, pool.max_workers), Stage("persist", persist, 1)]
+    pipeline = Pipeline(stages)
+
+    jobs = build_sweep_jobs(repetitions)
+    logger.info(f"🚀 Starting sweep: {len(jobs)} jobs, concurrency={concurrency}")
+
+    completed = 0
+    try:
+        async with llm:
+            with tqdm(total=len(jobs)) as progress:
+                async for _ in pipeline.run(jobs):
+                    completed += 1
+                    progress.update(1)
+
+        if processor and len(processed_texts) > 1:
+            # Batch job: update topics once with the whole sweep for the next run's per-response matching
+            logger.info(f"🧩 Updating topics with {len(processed_texts)} responses")
+            await pool.call(processor, "update_topic_model", processed_texts)
+    finally:
+        pool.shutdown()
+        tracker.close()
+        if cache:
+            logger.info(f"💾 Completion cache: {cache.stats()}")
+            cache.close()
+
+    failed = len(jobs) - completed
+    prefix_reuse = llm.prefix_stats.summary()
+    logger.info(f"📈 Pipeline stage stats: {pipeline.stats}")
+    logger.info(f"♻️ Prompt prefix reuse: {prefix_reuse}")
+    print(f"\n✅ Sweep finished: {completed} evaluated, {failed} failed, {len(jobs)} total")
+    print(f"♻️ Prefix reuse: {prefix_reuse['prefix_reuse_ratio']:.1%} of prompt characters shared with the previous request\n")
+    return {
+        "completed": completed,
+        "failed": failed,
+        "total": len(jobs),
+        "stages": pipeline.stats,
+        "prefix_reuse": prefix_reuse
+    }
+
+
 if __name__ == "__main__":
     config = Config()
     asyncio.run(run_evaluation(config))
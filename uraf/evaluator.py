@@ -1,93 +1,182 @@
-import evaluate
-import sentence_transformers
+import numpy as np
 import re
 from loguru import logger
+from uraf.metrics import load_metric
 from uraf.scorer import URAFScorer
+from uraf.model_registry import DEFAULT_EMBEDDING_MODEL, get_registry
+from uraf.worker_pool import get_default_pool
+
+REQUIRED_SECTIONS = ["Understanding:", "Reasoning Pathway:", "Final Synthesis:"]
 
 class LLMResponseEvaluator:
     """
     Evaluates responses based on structured reasoning (URAF), semantic similarity, and NLP metrics.
+    The similarity model and metrics are loaded on first use, so construction is cheap.
     """
 
-    def __init__(self):
+    def __init__(self, registry=None, model_name=DEFAULT_EMBEDDING_MODEL, pool=None, metrics_backend="offline"):
+        """
+        Args:
+            metrics_backend: "offline" for the built-in BLEU/ROUGE-L (no network access),
+                or "evaluate" to use the Hugging Face hub metric scripts
+        """
         logger.info("🔍 Initializing LLMResponseEvaluator...")
+        self.registry = registry or get_registry()
+        self._pool = pool
+        self.model_name = model_name
+        self.metrics_backend = metrics_backend
+        self.worker_init_kwargs = {"model_name": model_name, "metrics_backend": metrics_backend}
         self.uraf_scorer = URAFScorer()
-        self.bleu = evaluate.load("bleu")
-        self.rouge = evaluate.load("rouge")
-        self.similarity_model = sentence_transformers.SentenceTransformer("all-MiniLM-L6-v2")
+        self._bleu_metric = None
+        self._rouge_metric = None
         self.reference_text = ""
 
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = get_default_pool(self.registry)
+        return self._pool
+
+    @property
+    def similarity_model(self):
+        return self.registry.get_encoder(self.model_name)
+
+    @property
+    def bleu(self):
+        if self._bleu_metric is None:
+            self._bleu_metric = load_metric("bleu", self.metrics_backend)
+        return self._bleu_metric
+
+    @property
+    def rouge(self):
+        if self._rouge_metric is None:
+            self._rouge_metric = load_metric("rouge", self.metrics_backend)
+        return self._rouge_metric
+
     async def evaluate_response(self, response_text):
         """
         Evaluates an LLM response using multiple metrics.
-        Handles both 1D and 2D tensors for similarity calculation.
+        Single-item view of `evaluate_batch`.
         """
         try:
             if not response_text:
                 logger.error("❌ Empty response text")
                 return 0.0
-                
-            # Check for required sections
-            required_sections = ["Understanding:", "Reasoning Pathway:", "Final Synthesis:"]
-            has_structure = all(section in response_text for section in required_sections)
-            
-            if not has_structure:
-                logger.warning("⚠️ Response does not contain the expected structure. URAF score may be inaccurate.")
-            
-            # Clean up response text
-            response_text = re.sub(r'<\|.*?\|>', '', response_text)
-            response_text = response_text.strip()
-            
-            # Get embeddings
-            embedding = await self.get_embeddings([self.reference_text, response_text])
-            
-            # Ensure embeddings are 2D for matmul
-            if embedding[0].dim() == 1:
-                embedding = [e.unsqueeze(0) for e in embedding]
-            
-            # Calculate similarity using matrix multiplication
-            similarity_score = (embedding[0] @ embedding[1].mT).cpu().item()
-            
-            # Calculate ROUGE scores
-            rouge_scores = self.rouge.compute(
-                predictions=[response_text],
-                references=[[response_text]],  # Self-reference for coherence
-            )
+
+            scores = (await self.evaluate_batch([response_text]))[0]
             
-            # Extract ROUGE-L F1 score
-            rouge_l = rouge_scores["rougeL"]
+            logger.info(f"📊 URAF Evaluation Scores:")
+            logger.info(f"Structure Score: {scores['structure_score']:.2f}")
+            logger.info(f"Content Score: {scores['content_score']:.2f}")
+            logger.info(f"Final Score: {scores['final_score']:.2f}")
             
-            # Calculate BLEU score
-            bleu_score = self.bleu.compute(
-                predictions=[response_text],
-                references=[[response_text]],  # Self-reference for coherence
-                max_order=4
-            )["bleu"]
+            return scores["final_score"]
             
+        except Exception as e:
+            logger.error(f"❌ Error in evaluation: {str(e)}")
+            return 0.0
+
+    async def evaluate_batch(self, responses, references=None):
+        """
+        Scores many responses at once.
+
+        Args:
+            responses: List of LLM response texts
+            references: Reference texts for semantic similarity; a list aligned with
+                `responses`, a single string for all, or None for `self.reference_text`
+
+        Returns:
+            One score breakdown per response with structure_score, similarity,
+            rouge_l, bleu, content_score and final_score (0-10)
+
+        Scoring runs in the worker pool so the event loop keeps serving LLM requests.
+        """
+        if references is None:
+            references = self.reference_text
+        return await self.pool.call(self, "score_batch", list(responses), references)
+
+    def score_batch(self, responses, references=None):
+        """
+        Synchronous implementation of `evaluate_batch`: all texts are embedded in
+        one batched forward pass and similarities are computed as one row-wise product.
+        """
+        responses = [text or "" for text in responses]
+        if references is None or isinstance(references, str):
+            references = [references if references is not None else self.reference_text] * len(responses)
+        if len(references) != len(responses):
+            raise ValueError("responses and references must have the same length")
+
+        has_structure = [all(section in text for section in REQUIRED_SECTIONS) for text in responses]
+        missing_structure = has_structure.count(False)
+        if missing_structure:
+            logger.warning(f"⚠️ {missing_structure} response(s) do not contain the expected structure. URAF score may be inaccurate.")
+
+        # Clean up response text
+        cleaned = [re.sub(r'<\|.*?\|>', '', text).strip() for text in responses]
+        scored = [i for i, text in enumerate(cleaned) if text]
+        breakdowns = [self._empty_breakdown() for _ in responses]
+        if not scored:
+            return breakdowns
+
+        # Embed every distinct text once, then take row-wise dot products
+        texts = list(dict.fromkeys([references[i] for i in scored] + [cleaned[i] for i in scored]))
+        position = {text: idx for idx, text in enumerate(texts)}
+        embeddings = np.asarray(self.similarity_model.encode(texts))
+        reference_embeddings = embeddings[[position[references[i]] for i in scored]]
+        response_embeddings = embeddings[[position[cleaned[i]] for i in scored]]
+        similarities = np.einsum("ij,ij->i", reference_embeddings, response_embeddings)
+
+        # ROUGE-L for all responses in one call (self-reference for coherence)
+        predictions = [cleaned[i] for i in scored]
+        rouge_scores = self.rouge.compute(
+            predictions=predictions,
+            references=[[text] for text in predictions],
+            use_aggregator=False
+        )["rougeL"]
+
+        for i, similarity, rouge_l in zip(scored, similarities, rouge_scores):
+            bleu_score = self._bleu(cleaned[i])
+
             # Combine metrics into final score
-            structure_score = 1.0 if has_structure else 0.5
+            structure_score = 1.0 if has_structure[i] else 0.5
             content_score = (
-                similarity_score * 0.4 +
+                float(similarity) * 0.4 +
                 rouge_l * 0.2 +
                 bleu_score * 0.1
             )
-            
-            if content_score == 0:
-                logger.error("❌ Division by zero")
-                return 0.0
-            
-            final_score = (structure_score + content_score) * 5  # Scale to 0-10
-            
-            logger.info(f"📊 URAF Evaluation Scores:")
-            logger.info(f"Structure Score: {structure_score:.2f}")
-            logger.info(f"Content Score: {content_score:.2f}")
-            logger.info(f"Final Score: {final_score:.2f}")
-            
-            return final_score
-            
-        except Exception as e:
-            logger.error(f"❌ Error in evaluation: {str(e)}")
+            final_score = (structure_score + content_score) * 5 if content_score else 0.0  # Scale to 0-10
+
+            breakdowns[i] = {
+                "structure_score": structure_score,
+                "similarity": float(similarity),
+                "rouge_l": rouge_l,
+                "bleu": bleu_score,
+                "content_score": content_score,
+                "final_score": final_score
+            }
+
+        return breakdowns
+
+    def _bleu(self, text):
+        """BLEU of a response against itself (self-reference for coherence)."""
+        try:
+            return self.bleu.compute(predictions=[text], references=[[text]], max_order=4)["bleu"]
+        except ZeroDivisionError:
             return 0.0
 
+    @staticmethod
+    def _empty_breakdown():
+        return {
+            "structure_score": 0.0,
+            "similarity": 0.0,
+            "rouge_l": 0.0,
+            "bleu": 0.0,
+            "content_score": 0.0,
+            "final_score": 0.0
+        }
+
     async def get_embeddings(self, texts):
+        return await self.pool.call(self, "encode", texts)
+
+    def encode(self, texts):
         return self.similarity_model.encode(texts, convert_to_tensor=True)
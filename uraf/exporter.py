@@ -0,0 +1,166 @@
+import csv
+import json
+import os
+import tempfile
+from loguru import logger
+from uraf.result_store import extract_score
+
+BASE_COLUMNS = ["timestamp", "model", "agent_type", "score"]
+EXPORT_FORMATS = ("csv", "parquet")
+
+
+def _flatten(value, prefix, row):
+    if isinstance(value, dict):
+        for key, nested in value.items():
+            _flatten(nested, f"{prefix}.{key}", row)
+    elif isinstance(value, list):
+        row[prefix] = json.dumps(value)
+    else:
+        row[prefix] = value
+
+
+def flatten_record(record):
+    """
+    Flattens a stored result into one row: the base columns plus every nested
+    evaluation field as a dotted column, e.g. `evaluation.URAF Score.Total Score`.
+    """
+    row = {
+        "timestamp": record["timestamp"],
+        "model": record["model"],
+        "agent_type": record["agent_type"],
+        "score": extract_score(record["evaluation"])
+    }
+    _flatten(record["evaluation"], "evaluation", row)
+    return row
+
+
+def _value_kind(value):
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, (int, float)):
+        return "number"
+    return "string"
+
+
+def _spool(records, spool):
+    """
+    Flattens every record into `spool` (one JSON row per line) and returns the set of
+    value kinds seen per column, so the output schema covers every row.
+    """
+    kinds = {}
+    for record in records:
+        row = flatten_record(record)
+        for key, value in row.items():
+            column_kinds = kinds.setdefault(key, set())
+            if value is not None:
+                column_kinds.add(_value_kind(value))
+        spool.write(json.dumps(row) + "\n")
+    return kinds
+
+
+def _read_chunks(spool, chunk_size):
+    chunk = []
+    for line in spool:
+        chunk.append(json.loads(line))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def export_records(records, path, format=None, columns=None, chunk_size=10000):
+    """
+    Streams result records to CSV or Parquet in chunks of `chunk_size` rows, so memory
+    stays bounded regardless of history size. Records are flattened into a temporary
+    spool file first, so columns that only appear in later records are kept and every
+    column gets one type.
+
+    Args:
+        records: Iterable of stored result records (e.g. BenchmarkTracker.iter_results())
+        path: Output file
+        format: "csv" or "parquet"; inferred from the extension when omitted
+        columns: Columns to export; by default the base columns plus every field seen in the records
+        chunk_size: Rows written per batch
+
+    Returns:
+        Number of rows written
+    """
+    format = format or os.path.splitext(path)[1].lstrip(".").lower() or "csv"
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{format}', expected one of {EXPORT_FORMATS}")
+
+    writer = _write_parquet if format == "parquet" else _write_csv
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+        kinds = _spool(records, spool)
+        if columns:
+            columns = list(columns)
+        else:
+            columns = BASE_COLUMNS + sorted(set(kinds) - set(BASE_COLUMNS))
+        spool.seek(0)
+        rows = writer(_read_chunks(spool, chunk_size), path, columns, kinds)
+    logger.info(f"📤 Exported {rows} results to {path}")
+    return rows
+
+
+def _write_csv(chunks, path, columns, kinds):
+    rows = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        for chunk in chunks:
+            writer.writerows(chunk)
+            rows += len(chunk)
+    return rows
+
+
+def _write_parquet(chunks, path, columns, kinds):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        logger.error("Parquet export requires pyarrow: `pip install pyarrow`")
+        raise
+
+    rows = 0
+    schema = _schema(pa, columns, kinds)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pylist(_conform(pa, chunk, schema), schema=schema))
+            rows += len(chunk)
+    return rows
+
+
+def _schema(pa, columns, kinds):
+    """
+    Numeric columns become float64 and boolean columns bool; columns that are all null
+    or mix kinds (e.g. a number in some records and a string in others) are widened to string.
+    """
+    fields = []
+    for column in columns:
+        column_kinds = kinds.get(column, set())
+        if column_kinds == {"number"}:
+            fields.append((column, pa.float64()))
+        elif column_kinds == {"bool"}:
+            fields.append((column, pa.bool_()))
+        else:
+            if len(column_kinds) > 1:
+                logger.warning(f"⚠️ Column '{column}' mixes {sorted(column_kinds)} values; exporting it as string")
+            fields.append((column, pa.string()))
+    return pa.schema(fields)
+
+
+def _conform(pa, chunk, schema):
+    """Coerces rows to the export schema; values of widened columns are written as strings."""
+    converters = {}
+    for field in schema:
+        if pa.types.is_floating(field.type):
+            converters[field.name] = float
+        elif pa.types.is_string(field.type):
+            converters[field.name] = lambda v: v if isinstance(v, str) else json.dumps(v)
+        else:
+            converters[field.name] = lambda v: v
+    return [
+        {name: (None if row.get(name) is None else convert(row[name])) for name, convert in converters.items()}
+        for row in chunk
+    ]
@@ -1,11 +1,117 @@
 import aiohttp
 import asyncio
 import json
+import os
 import re
+import time
 from loguru import logger
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 import guidance
-from .prompt_manager import PromptManager
+from .prompt_manager import PromptManager, StructureMonitor
+
+
+class InvalidStructureError(ValueError):
+    """Raised when a completion (or a stream in progress) cannot satisfy the response structure."""
+
+
+def _give_up(retry_state):
+    logger.error(f"❌ LLM response still malformed after {retry_state.attempt_number} attempts")
+    return None
+
+
+class RequestThrottle:
+    """
+    Applies backpressure to LLM requests.
+    Bounds the number of in-flight requests and optionally paces them to a
+    requests-per-second and/or tokens-per-second budget.
+    """
+
+    def __init__(self, max_concurrency=None, requests_per_second=None, tokens_per_second=None):
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.tokens_per_second = tokens_per_second
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._lock = asyncio.Lock()
+        self._next_request_at = 0.0
+        self._tokens_repaid_at = 0.0
+
+    async def __aenter__(self):
+        if self._semaphore:
+            await self._semaphore.acquire()
+        try:
+            await self._wait_for_budget()
+        except BaseException:
+            if self._semaphore:
+                self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._semaphore:
+            self._semaphore.release()
+
+    async def _wait_for_budget(self):
+        """Reserves the next request slot and sleeps until the budgets allow it."""
+        if not self.requests_per_second and not self.tokens_per_second:
+            return
+
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            start_at = max(now, self._next_request_at, self._tokens_repaid_at)
+            if self.requests_per_second:
+                self._next_request_at = start_at + 1.0 / self.requests_per_second
+
+        delay = start_at - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record_tokens(self, tokens):
+        """
+        Charges consumed tokens against the tokens-per-second budget.
+        Token counts are only known after a response, so the cost is paid back
+        by delaying the requests that follow.
+        """
+        if not self.tokens_per_second or not tokens:
+            return
+        now = asyncio.get_running_loop().time()
+        self._tokens_repaid_at = max(now, self._tokens_repaid_at) + tokens / self.tokens_per_second
+
+
+class PrefixReuseStats:
+    """
+    Measures how much of each prompt repeats the start of the previous one, i.e. how
+    much KV cache a prefix-caching server (llama.cpp, vLLM) can reuse. When the server
+    reports cached prompt tokens in `usage.prompt_tokens_details`, those are summed too.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_chars = 0
+        self.reused_chars = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self._previous = ""
+
+    def record_prompt(self, prompt):
+        self.requests += 1
+        self.prompt_chars += len(prompt)
+        self.reused_chars += len(os.path.commonprefix([self._previous, prompt]))
+        self._previous = prompt
+
+    def record_usage(self, usage):
+        details = (usage or {}).get("prompt_tokens_details") or {}
+        if "cached_tokens" in details:
+            self.prompt_tokens += usage.get("prompt_tokens") or 0
+            self.cached_tokens += details["cached_tokens"] or 0
+
+    def summary(self):
+        return {
+            "requests": self.requests,
+            "prefix_reuse_ratio": self.reused_chars / self.prompt_chars if self.prompt_chars else 0.0,
+            "server_cached_ratio": self.cached_tokens / self.prompt_tokens if self.prompt_tokens else None
+        }
+
 
 class LLMClient:
     """
@@ -13,7 +119,9 @@ class LLMClient:
     """
 
     def __init__(self, model="qwen2.5-7b-instruct-1m", api_url="http://localhost:1234/v1/completions", 
-                 max_tokens=4000, temperature=0.5, top_p=0.85, top_k=50):
+                 max_tokens=4000, temperature=0.5, top_p=0.85, top_k=50,
+                 connector_limit=100, limit_per_host=0, keepalive_timeout=60, dns_cache_ttl=300,
+                 request_timeout=None, stream=False, stream_abort_fraction=0.5, cache=None):
         self.model = model
         self.api_url = api_url
         self.max_tokens = max_tokens
@@ -21,6 +129,63 @@ class LLMClient:
         self.top_p = top_p
         self.top_k = top_k
 
+        # Streaming mode: abort if no reasoning section appears within this fraction of max_tokens
+        self.stream = stream
+        self.stream_abort_fraction = stream_abort_fraction
+
+        # Connection pool settings for the shared session
+        self.connector_limit = connector_limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.request_timeout = request_timeout
+        self._session = None
+        self._session_loop = None
+
+        # Shared-prefix reuse across the prompts this client has sent
+        self.prefix_stats = PrefixReuseStats()
+
+        # Optional CompletionCache for validated completions
+        self.cache = cache
+
+    async def __aenter__(self):
+        self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_session(self):
+        """
+        Returns the shared keep-alive session, creating it on first use.
+        Sessions are bound to an event loop, so a new one is opened if the loop changed.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._session_loop is loop:
+            return self._session
+
+        connector = aiohttp.TCPConnector(
+            limit=self.connector_limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True
+        )
+        # trust_env=False keeps HTTP(S)_PROXY settings away from localhost endpoints
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            trust_env=False
+        )
+        self._session_loop = loop
+        return self._session
+
+    async def close(self):
+        """Closes the shared HTTP session and its pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
     def clean_response(self, text):
         """Clean up LLM response."""
         if not text:
@@ -48,61 +213,223 @@ class LLMClient:
             
         return text
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=2))
-    async def query(self, prompt, technique=None):
-        """Query the LLM API with guidance-based structured enforcement."""
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=2),
+           retry=retry_if_exception_type(InvalidStructureError), retry_error_callback=_give_up)
+    async def query(self, prompt, technique=None, stream=None, sample=0):
+        """
+        Query the LLM API with guidance-based structured enforcement.
+        With `stream` enabled (defaults to the client setting) the completion is consumed
+        as server-sent chunks and aborted early once it cannot satisfy the structure.
+        Malformed completions are retried; transport and API errors return None.
+        `sample` distinguishes repeated samples of the same prompt in the completion cache.
+        """
+        stream = self.stream if stream is None else stream
         try:
-            # Get structured prompt using guidance
-            structured_prompt = PromptManager.get_structured_prompt(prompt, technique)
+            # Render the structured prompt from the technique's compiled template
+            structured_prompt = PromptManager.render_prompt(prompt, technique)
+
+            cache_key = None
+            if self.cache is not None and self.cache.mode != "bypass":
+                cache_key = self._cache_key(structured_prompt, sample)
+                cached = await self.cache.aget(cache_key)
+                if cached is not None:
+                    logger.info("💾 Completion cache hit")
+                    return {**cached, "metrics": {**(cached.get("metrics") or {}), "cached": True}}
+
+            self.prefix_stats.record_prompt(structured_prompt)
             
             # Format request for LM Studio API
             data = {
                 "model": self.model,
-                "prompt": str(structured_prompt),
+                "prompt": structured_prompt,
                 "max_tokens": self.max_tokens,
                 "temperature": self.temperature,
                 "top_p": self.top_p,
                 "top_k": self.top_k,
-                "stream": False
-            }
-            
-            # Disable proxy for localhost
-            proxies = {
-                "http": None,
-                "https": None
+                "stream": stream
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.api_url, json=data, proxies=proxies) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        logger.info(f"🔍 LLM Full API Response: {json.dumps(result, indent=2)}")
-                        
-                        if result and "choices" in result and len(result["choices"]) > 0:
-                            text = result["choices"][0].get("text", "").strip()
-                            cleaned_text = self.clean_response(text)
-                            
-                            # Validate structure
-                            if PromptManager.validate_structure(cleaned_text):
-                                return {
-                                    "summary": cleaned_text,
-                                    "raw_text": prompt
-                                }
-                            else:
-                                logger.warning("⚠️ LLM response did not follow the expected structure. Retrying...")
-                                raise ValueError("Invalid response structure")
-                    
+            session = self._get_session()
+            started = time.perf_counter()
+            async with session.post(self.api_url, json=data) as response:
+                if response.status != 200:
                     logger.error(f"❌ LLM API Error: {response.status} - {await response.text()}")
                     return None
-                    
+
+                if stream:
+                    text, usage, metrics = await self._read_stream(response, started)
+                else:
+                    result = await response.json()
+                    logger.info(f"🔍 LLM Full API Response: {json.dumps(result, indent=2)}")
+
+                    if not (result and "choices" in result and len(result["choices"]) > 0):
+                        logger.error(f"❌ LLM API Error: {response.status} - empty completion")
+                        return None
+
+                    text = result["choices"][0].get("text", "")
+                    usage = result.get("usage", {})
+                    metrics = {"latency": time.perf_counter() - started}
+
+                self.prefix_stats.record_usage(usage)
+
+            cleaned_text = self.clean_response(text.strip())
+            
+            # Validate structure
+            if PromptManager.validate_structure(cleaned_text):
+                result = {
+                    "summary": cleaned_text,
+                    "raw_text": prompt,
+                    "usage": usage,
+                    "metrics": metrics
+                }
+                if cache_key:
+                    await self.cache.aput(cache_key, result)
+                return result
+            else:
+                logger.warning("⚠️ LLM response did not follow the expected structure. Retrying...")
+                raise InvalidStructureError("Invalid response structure")
+
+        except InvalidStructureError:
+            raise  # Let @retry run the query again
         except Exception as e:
             logger.error(f"❌ LLM Query Error: {str(e)}")
             return None
 
-    async def batch_query(self, prompts):
+    def _cache_key(self, structured_prompt, sample=0):
+        """
+        Cache key over everything that determines the completion. Each sample index gets
+        its own entry, so repeated samples keep measuring sampling variance.
+        """
+        return self.cache.make_key(
+            self.model, self.api_url, structured_prompt,
+            temperature=self.temperature, top_p=self.top_p, top_k=self.top_k, max_tokens=self.max_tokens,
+            sample=sample
+        )
+
+    async def _read_stream(self, response, started):
+        """
+        Consumes an OpenAI-style server-sent event stream.
+        Returns the generated text, the usage block (if the server sends one) and
+        timing metrics: time-to-first-token, total latency and tokens/sec.
+        """
+        monitor = StructureMonitor(self.max_tokens, self.stream_abort_fraction)
+        pieces = []
+        usage = {}
+        first_token_at = None
+
+        async for raw_line in response.content:
+            line = raw_line.decode("utf-8").strip()
+            if not line.startswith("data:"):
+                continue
+
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                break
+
+            chunk = json.loads(payload)
+            usage = chunk.get("usage") or usage
+            choices = chunk.get("choices") or []
+            piece = choices[0].get("text", "") if choices else ""
+            if not piece:
+                continue
+
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            pieces.append(piece)
+
+            if not monitor.feed(piece):
+                # Leaving the response context drops the connection, which stops generation
+                logger.warning(f"⚠️ Aborting stream after {monitor.tokens} tokens: {monitor.reason}")
+                raise InvalidStructureError("Invalid response structure")
+
+        finished = time.perf_counter()
+        completion_tokens = usage.get("completion_tokens") or monitor.tokens
+        generation_time = finished - (first_token_at or finished)
+        metrics = {
+            "ttft": (first_token_at - started) if first_token_at else None,
+            "latency": finished - started,
+            "completion_tokens": completion_tokens,
+            "tokens_per_sec": completion_tokens / generation_time if generation_time > 0 else None
+        }
+        logger.info(f"⏱️ Stream metrics: {metrics}")
+        return "".join(pieces), usage, metrics
+
+    async def throttled_query(self, throttle, prompt, technique=None, sample=0):
+        """
+        Runs `query` inside a RequestThrottle slot and charges the tokens it used.
+        """
+        async with throttle:
+            response = await self.query(prompt, technique, sample=sample)
+
+        if response and not (response.get("metrics") or {}).get("cached"):
+            usage = response.get("usage") or {}
+            tokens = usage.get("total_tokens") or len(response["summary"].split())
+            throttle.record_tokens(tokens)
+        return response
+
+    async def iter_batch_query(self, prompts, technique=None, max_concurrency=None,
+                               requests_per_second=None, tokens_per_second=None, throttle=None):
+        """
+        Sends multiple queries concurrently and yields `(index, response)` pairs as they complete.
+        With one technique per prompt, prompts are submitted grouped by technique so that
+        requests sharing a prompt prefix reach the server back to back.
+
+        Args:
+            prompts: Iterable of prompts (consumed lazily when max_concurrency is set)
+            technique: A single technique, or a list with one technique per prompt
+            max_concurrency: Maximum number of requests in flight (unbounded if None)
+            requests_per_second: Optional request pacing budget
+            tokens_per_second: Optional token budget, charged from each response's usage
+            throttle: Optional shared RequestThrottle; overrides the budget arguments
+        """
+        throttle = throttle or RequestThrottle(max_concurrency, requests_per_second, tokens_per_second)
+        per_prompt_technique = isinstance(technique, (list, tuple))
+
+        if per_prompt_technique:
+            prompts = list(prompts)
+            jobs = iter([(index, prompts[index]) for index in PromptManager.group_by_technique(technique)])
+        else:
+            if not max_concurrency:
+                prompts = list(prompts)
+            jobs = enumerate(prompts)
+        worker_count = max_concurrency or len(prompts)
+        if worker_count == 0:
+            return
+
+        # Bounded so that a slow consumer stalls the workers instead of piling up results
+        results = asyncio.Queue(maxsize=worker_count)
+
+        async def worker():
+            for index, prompt in jobs:
+                prompt_technique = technique[index] if per_prompt_technique else technique
+                response = await self.throttled_query(throttle, prompt, prompt_technique)
+                await results.put((index, response))
+
+        async def finish(workers):
+            await asyncio.gather(*workers, return_exceptions=True)
+            await results.put(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(worker_count)]
+        finisher = asyncio.create_task(finish(workers))
+        try:
+            while True:
+                item = await results.get()
+                if item is None:
+                    break
+                yield item
+        finally:
+            for task in workers + [finisher]:
+                task.cancel()
+
+    async def batch_query(self, prompts, technique=None, max_concurrency=None,
+                          requests_per_second=None, tokens_per_second=None):
         """
-        Sends multiple queries in parallel.
+        Sends multiple queries in parallel and returns the responses in prompt order.
         """
-        tasks = [self.query(prompt) for prompt in prompts]
-        responses = await asyncio.gather(*tasks)
+        prompts = list(prompts)
+        responses = [None] * len(prompts)
+        async for index, response in self.iter_batch_query(
+            prompts, technique, max_concurrency, requests_per_second, tokens_per_second
+        ):
+            responses[index] = response
         return responses
@@ -0,0 +1,167 @@
+import math
+import re
+from collections import Counter
+
+# Offline re-implementations of the `evaluate` BLEU and ROUGE-L metrics. They follow
+# the same tokenization and formulas as the hub scripts, so scores are interchangeable,
+# but need no network access or metric download.
+
+METRIC_BACKENDS = ("offline", "evaluate")
+
+
+def tokenize_13a(text):
+    """Approximation of sacrebleu's 13a tokenizer used by the hub BLEU metric."""
+    text = text.replace("<skipped>", "").replace("-\n", "").replace("\n", " ")
+    if "&" in text:
+        text = text.replace("&quot;", '"').replace("&amp;", "&").replace("&lt;", "<").replace("&gt;", ">")
+    text = f" {text} "
+    text = re.sub(r"([\{-\~\[-\` -\&\(-\+\:-\@\/])", r" \1 ", text)
+    text = re.sub(r"([^0-9])([\.,])", r"\1 \2 ", text)
+    text = re.sub(r"([\.,])([^0-9])", r" \1 \2", text)
+    text = re.sub(r"([0-9])(-)", r"\1 \2 ", text)
+    return text.split()
+
+
+def tokenize_rouge(text):
+    """rouge_score's default tokenizer: lowercase, alphanumeric runs only."""
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).split()
+
+
+def _ngrams(tokens, max_order):
+    counts = Counter()
+    for order in range(1, max_order + 1):
+        for i in range(len(tokens) - order + 1):
+            counts[tuple(tokens[i:i + order])] += 1
+    return counts
+
+
+def corpus_bleu(predictions, references, max_order=4, smooth=False):
+    """
+    Corpus BLEU with modified n-gram precision, geometric mean and brevity penalty.
+
+    Args:
+        predictions: List of candidate texts
+        references: List of reference lists (one or more references per prediction)
+
+    Returns:
+        Dict with bleu, precisions, brevity_penalty, length_ratio,
+        translation_length and reference_length, like `evaluate.load("bleu")`
+    """
+    matches_by_order = [0] * max_order
+    possible_by_order = [0] * max_order
+    translation_length = 0
+    reference_length = 0
+
+    for prediction, refs in zip(predictions, references):
+        if isinstance(refs, str):
+            refs = [refs]
+        pred_tokens = tokenize_13a(prediction)
+        ref_tokens = [tokenize_13a(ref) for ref in refs]
+        translation_length += len(pred_tokens)
+        reference_length += min(len(tokens) for tokens in ref_tokens)
+
+        max_ref_counts = Counter()
+        for tokens in ref_tokens:
+            max_ref_counts |= _ngrams(tokens, max_order)
+        pred_counts = _ngrams(pred_tokens, max_order)
+        for ngram, count in (pred_counts & max_ref_counts).items():
+            matches_by_order[len(ngram) - 1] += count
+        for order in range(1, max_order + 1):
+            possible = len(pred_tokens) - order + 1
+            if possible > 0:
+                possible_by_order[order - 1] += possible
+
+    precisions = []
+    for i in range(max_order):
+        if smooth:
+            precisions.append((matches_by_order[i] + 1.0) / (possible_by_order[i] + 1.0))
+        elif possible_by_order[i] > 0:
+            precisions.append(matches_by_order[i] / possible_by_order[i])
+        else:
+            precisions.append(0.0)
+
+    geo_mean = math.exp(sum(math.log(p) for p in precisions) / max_order) if min(precisions) > 0 else 0.0
+
+    ratio = translation_length / reference_length if reference_length else 0.0
+    if ratio > 1.0:
+        brevity_penalty = 1.0
+    elif ratio > 0:
+        brevity_penalty = math.exp(1 - 1.0 / ratio)
+    else:
+        brevity_penalty = 0.0
+
+    return {
+        "bleu": geo_mean * brevity_penalty,
+        "precisions": precisions,
+        "brevity_penalty": brevity_penalty,
+        "length_ratio": ratio,
+        "translation_length": translation_length,
+        "reference_length": reference_length
+    }
+
+
+def lcs_length(a, b):
+    """Length of the longest common subsequence of two token lists (two-row DP)."""
+    if a == b:
+        return len(a)
+    if len(a) < len(b):
+        a, b = b, a
+    previous = [0] * (len(b) + 1)
+    for token in a:
+        current = [0]
+        for j, other in enumerate(b):
+            current.append(previous[j] + 1 if token == other else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+def rouge_l(prediction, reference):
+    """ROUGE-L F-measure between two texts."""
+    pred_tokens = tokenize_rouge(prediction)
+    ref_tokens = tokenize_rouge(reference)
+    if not pred_tokens or not ref_tokens:
+        return 0.0
+    lcs = lcs_length(pred_tokens, ref_tokens)
+    if not lcs:
+        return 0.0
+    precision = lcs / len(pred_tokens)
+    recall = lcs / len(ref_tokens)
+    return 2 * precision * recall / (precision + recall)
+
+
+class OfflineBleu:
+    """Drop-in for `evaluate.load("bleu")` that computes BLEU locally."""
+
+    def compute(self, predictions, references, max_order=4, smooth=False):
+        return corpus_bleu(predictions, references, max_order=max_order, smooth=smooth)
+
+
+class OfflineRouge:
+    """Drop-in for `evaluate.load("rouge")` restricted to ROUGE-L."""
+
+    def compute(self, predictions, references, use_aggregator=True, **kwargs):
+        scores = []
+        for prediction, refs in zip(predictions, references):
+            if isinstance(refs, str):
+                refs = [refs]
+            scores.append(max(rouge_l(prediction, ref) for ref in refs))
+        if use_aggregator:
+            return {"rougeL": sum(scores) / len(scores) if scores else 0.0}
+        return {"rougeL": scores}
+
+
+def load_metric(name, backend="offline"):
+    """
+    Returns a metric object with an `evaluate`-style `compute` method.
+    The "offline" backend needs no network; "evaluate" fetches the hub implementation.
+    """
+    if backend not in METRIC_BACKENDS:
+        raise ValueError(f"Unknown metrics backend {backend!r}; expected one of {METRIC_BACKENDS}")
+    if backend == "evaluate":
+        import evaluate
+        return evaluate.load(name)
+    if name == "bleu":
+        return OfflineBleu()
+    if name == "rouge":
+        return OfflineRouge()
+    raise ValueError(f"No offline implementation of metric {name!r}")
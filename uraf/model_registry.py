@@ -0,0 +1,90 @@
+import threading
+from loguru import logger
+from .embedding_cache import CachedEncoder, EmbeddingCache
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+
+class ModelRegistry:
+    """
+    Process-wide provider of shared NLP models.
+    Each model is loaded lazily on first request and the same instance is handed
+    out for every later request with the same name and device.
+    """
+
+    def __init__(self, embedding_cache=None):
+        self.embedding_cache = embedding_cache or EmbeddingCache()
+        self._models = {}
+        self._lock = threading.RLock()
+
+    def _get_or_load(self, key, loader):
+        model = self._models.get(key)
+        if model is None:
+            with self._lock:
+                model = self._models.get(key)
+                if model is None:
+                    logger.info(f"📦 Loading shared model {key}")
+                    model = loader()
+                    self._models[key] = model
+        return model
+
+    def get_sentence_transformer(self, model_name=DEFAULT_EMBEDDING_MODEL, device=None):
+        """Returns the shared SentenceTransformer for a model name and device."""
+        def load():
+            from sentence_transformers import SentenceTransformer
+            return SentenceTransformer(model_name, device=device)
+
+        return self._get_or_load(("sentence-transformer", model_name, device), load)
+
+    def get_encoder(self, model_name=DEFAULT_EMBEDDING_MODEL, device=None):
+        """
+        Returns the shared SentenceTransformer wrapped so that `encode` goes
+        through the registry's embedding cache.
+        """
+        def load():
+            model = self.get_sentence_transformer(model_name, device)
+            return CachedEncoder(model, model_name, self.embedding_cache)
+
+        return self._get_or_load(("encoder", model_name, device), load)
+
+    def get_keybert(self, model_name=DEFAULT_EMBEDDING_MODEL, device=None):
+        """
+        Returns a shared KeyBERT instance backed by the shared cached encoder, so candidate
+        keyphrases that recur across responses are only embedded once.
+        """
+        def load():
+            from keybert import KeyBERT
+            from keybert.backend import BaseEmbedder
+
+            class CachedEncoderBackend(BaseEmbedder):
+                def __init__(self, encoder):
+                    super().__init__()
+                    self.embedding_model = encoder
+
+                def embed(self, documents, verbose=False):
+                    return self.embedding_model.encode(documents, show_progress_bar=verbose)
+
+            return KeyBERT(model=CachedEncoderBackend(self.get_encoder(model_name, device)))
+
+        return self._get_or_load(("keybert", model_name, device), load)
+
+    def loaded_models(self):
+        """Lists the keys of all models loaded so far."""
+        return list(self._models.keys())
+
+
+_default_registry = ModelRegistry()
+
+
+def get_registry():
+    """Returns the default process-wide model registry."""
+    return _default_registry
+
+
+def set_registry(registry):
+    """
+    Replaces the default registry, e.g. with one that persists its embedding cache:
+    `set_registry(ModelRegistry(EmbeddingCache(path="data/embedding_cache")))`
+    """
+    global _default_registry
+    _default_registry = registry
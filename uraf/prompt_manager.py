@@ -1,14 +1,12 @@
+import threading
 import guidance
 from loguru import logger
 
-class PromptManager:
-    """
-    Enforces structured reasoning responses using guidance.
-    """
+# Stand-in task used to render each template once and locate where the task goes
+TASK_PLACEHOLDER = "\x00URAF_TASK\x00"
 
-    @staticmethod
-    def base_template(task):
-        return guidance('''
+
+BASE_TEMPLATE = '''
         {{#system}}
         You are an advanced reasoning system employing multiple cognitive frameworks.
         Ensure that responses follow strict reasoning formats.
@@ -23,11 +21,9 @@ class PromptManager:
         *Illustrative Example:* {{gen 'illustrative_example' max_tokens=200}}
         *Final Synthesis:* {{gen 'final_synthesis' max_tokens=250}}
         {{/assistant}}
-        ''')(task=task)
+        '''
 
-    @staticmethod
-    def tree_of_thoughts(task):
-        return guidance('''
+TREE_OF_THOUGHTS_TEMPLATE = '''
         {{#system}}
         Apply Tree of Thoughts reasoning:
         1. Decompose the problem into components
@@ -63,11 +59,9 @@ class PromptManager:
 
         *Final Synthesis:* {{gen 'final_synthesis' max_tokens=200}}
         {{/assistant}}
-        ''')(task=task)
+        '''
 
-    @staticmethod
-    def self_consistency(task):
-        return guidance('''
+SELF_CONSISTENCY_TEMPLATE = '''
         {{#system}}
         Apply Self-Consistency reasoning:
         1. Generate multiple independent solutions
@@ -93,11 +87,9 @@ class PromptManager:
 
         *Final Synthesis:* {{gen 'final_synthesis' max_tokens=200}}
         {{/assistant}}
-        ''')(task=task)
+        '''
 
-    @staticmethod
-    def self_critique(task):
-        return guidance('''
+SELF_CRITIQUE_TEMPLATE = '''
         {{#system}}
         Apply Self-Critique reasoning:
         1. Generate initial response
@@ -123,21 +115,111 @@ class PromptManager:
 
         *Final Synthesis:* {{gen 'final_synthesis' max_tokens=200}}
         {{/assistant}}
-        ''')(task=task)
+        '''
+
+
+class PromptManager:
+    """
+    Enforces structured reasoning responses using guidance.
+    Each technique's template is compiled once; per request only the task is substituted.
+    """
+
+    TEMPLATES = {
+        "base": BASE_TEMPLATE,
+        "tree-of-thoughts": TREE_OF_THOUGHTS_TEMPLATE,
+        "self-consistency": SELF_CONSISTENCY_TEMPLATE,
+        "self-critique": SELF_CRITIQUE_TEMPLATE
+    }
+
+    _programs = {}
+    _rendered = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def technique_key(technique):
+        """Maps a technique name onto its template key; unknown techniques use the base template."""
+        return technique if technique in PromptManager.TEMPLATES else "base"
+
+    @staticmethod
+    def compile(technique=None):
+        """Returns the parsed guidance program for a technique, parsing it on first use."""
+        key = PromptManager.technique_key(technique)
+        program = PromptManager._programs.get(key)
+        if program is None:
+            with PromptManager._lock:
+                program = PromptManager._programs.get(key)
+                if program is None:
+                    program = guidance(PromptManager.TEMPLATES[key])
+                    PromptManager._programs[key] = program
+        return program
+
+    @staticmethod
+    def base_template(task):
+        return PromptManager.compile("base")(task=task)
+
+    @staticmethod
+    def tree_of_thoughts(task):
+        return PromptManager.compile("tree-of-thoughts")(task=task)
+
+    @staticmethod
+    def self_consistency(task):
+        return PromptManager.compile("self-consistency")(task=task)
+
+    @staticmethod
+    def self_critique(task):
+        return PromptManager.compile("self-critique")(task=task)
 
     @staticmethod
     def get_structured_prompt(task, technique=None):
         """
         Generates a prompt with enforced response structure using guidance.
         """
-        if technique == "tree-of-thoughts":
-            return PromptManager.tree_of_thoughts(task)
-        elif technique == "self-consistency":
-            return PromptManager.self_consistency(task)
-        elif technique == "self-critique":
-            return PromptManager.self_critique(task)
-        else:
-            return PromptManager.base_template(task)
+        return PromptManager.compile(technique)(task=task)
+
+    @staticmethod
+    def render_parts(technique=None):
+        """
+        Returns the rendered prompt text around the task as (prefix, suffix), or None
+        if the template cannot be split. Rendered once per technique with a placeholder task.
+        """
+        key = PromptManager.technique_key(technique)
+        if key not in PromptManager._rendered:
+            try:
+                rendered = str(PromptManager.compile(key)(task=TASK_PLACEHOLDER))
+            except Exception as e:
+                logger.warning(f"⚠️ Could not pre-render the '{key}' template: {e}")
+                rendered = ""
+            if rendered.count(TASK_PLACEHOLDER) == 1:
+                parts = tuple(rendered.split(TASK_PLACEHOLDER))
+            else:
+                logger.warning(f"⚠️ Could not split the '{key}' template around its task; rendering per request")
+                parts = None
+            PromptManager._rendered[key] = parts
+        return PromptManager._rendered[key]
+
+    @staticmethod
+    def render_prompt(task, technique=None):
+        """
+        Renders the prompt text sent to the LLM API.
+        Equivalent to `str(get_structured_prompt(task, technique))` without re-running the template.
+        """
+        parts = PromptManager.render_parts(technique)
+        if parts is None:
+            return str(PromptManager.get_structured_prompt(task, technique))
+        prefix, suffix = parts
+        return f"{prefix}{task}{suffix}"
+
+    @staticmethod
+    def group_by_technique(techniques):
+        """
+        Returns prompt indices ordered so that prompts sharing a template (and therefore
+        a byte-identical prefix) are adjacent. Groups keep first-appearance order and
+        prompts keep their relative order within a group.
+        """
+        groups = {}
+        for index, technique in enumerate(techniques):
+            groups.setdefault(PromptManager.technique_key(technique), []).append(index)
+        return [index for indices in groups.values() for index in indices]
 
     @staticmethod
     def validate_structure(response):
@@ -150,3 +232,48 @@ class PromptManager:
             "*Final Synthesis:*"
         ]
         return all(section in response for section in required_sections)
+
+
+class StructureMonitor:
+    """
+    Tracks section headers incrementally while a response is streamed and
+    decides as early as possible whether it can still pass `validate_structure`.
+
+    Mirrors the leniency of `LLMClient.clean_response`: *Understanding:* is inserted
+    during cleanup, and plain "Reasoning:" / "Synthesis:" headers are promoted.
+    """
+
+    SECTION_MARKERS = {
+        "Reasoning Pathway": ("*Reasoning Pathway:*", "Reasoning:"),
+        "Final Synthesis": ("*Final Synthesis:*", "Synthesis:")
+    }
+
+    def __init__(self, max_tokens, reasoning_deadline_fraction=0.5, synthesis_deadline_fraction=0.9):
+        self.reasoning_deadline = int(max_tokens * reasoning_deadline_fraction)
+        self.synthesis_deadline = int(max_tokens * synthesis_deadline_fraction)
+        self.tokens = 0
+        self.seen = set()
+        self.reason = None
+        self._tail = ""
+        self._overlap = max(len(marker) for markers in self.SECTION_MARKERS.values() for marker in markers)
+
+    def feed(self, piece):
+        """
+        Consumes one streamed chunk. Returns False once the response clearly
+        cannot satisfy the required structure.
+        """
+        self.tokens += 1
+        window = self._tail + piece
+        for section, markers in self.SECTION_MARKERS.items():
+            if section not in self.seen and any(marker in window for marker in markers):
+                self.seen.add(section)
+        # Keep just enough text to catch headers split across chunks
+        self._tail = window[-self._overlap:]
+
+        if "Reasoning Pathway" not in self.seen and self.tokens >= self.reasoning_deadline:
+            self.reason = f"no reasoning section within the first {self.reasoning_deadline} tokens"
+            return False
+        if "Final Synthesis" not in self.seen and self.tokens >= self.synthesis_deadline:
+            self.reason = f"no final synthesis within the first {self.synthesis_deadline} tokens"
+            return False
+        return True
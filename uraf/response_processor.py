@@ -1,6 +1,10 @@
+import threading
+from collections import OrderedDict
 from flashtext import KeywordProcessor
-from keybert import KeyBERT
-from sentence_transformers import SentenceTransformer, util
+from loguru import logger
+from .analysis_context import AnalysisContext
+from .model_registry import get_registry
+from .worker_pool import get_default_pool
 from .topic_modeling import TopicModeling
 from .summary_comparator import SummaryComparator
 
@@ -11,17 +15,26 @@ class ResponseProcessor:
     - KeyBERT for embeddings-based keyphrase extraction
     - Sentence-Transformers for semantic similarity
     - BERTopic for dynamic topic modeling
+
+    Single responses are matched against previously fitted topics; the topic model
+    itself is only refitted by `refit_topics` / `batch_process`.
     """
 
-    def __init__(self):
+    def __init__(self, registry=None, pool=None, topic_model_path=None, online_topics=False, topic_clusters=20):
+        # Shared models: every component below uses the same loaded instances
+        self.registry = registry or get_registry()
+        self.pool = pool or get_default_pool(self.registry)
+        self.worker_init_kwargs = {"topic_model_path": topic_model_path, "online_topics": online_topics,
+                                   "topic_clusters": topic_clusters}
+
         # Core NLP components
         self.keyword_processor = KeywordProcessor(case_sensitive=False)
-        self.bert_model = KeyBERT()
-        self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-        
-        # Advanced analysis components
-        self.topic_model = TopicModeling(min_topic_size=2)  # Smaller size for individual responses
-        self.summary_comparator = SummaryComparator()
+
+        # Models and the topic model are built on first use, so in process mode only the
+        # workers load them
+        self._topic_model = None
+        self._summary_comparator = None
+        self._components_lock = threading.Lock()
         
         # Common entities we want to track
         self.common_entities = [
@@ -33,63 +46,100 @@ class ResponseProcessor:
         # Response cache for comparative analysis
         self.response_cache = []
         self.max_cache_size = 10
+        # Analysis contexts of cached responses, so history comparisons reuse their embeddings
+        self.context_cache = OrderedDict()
+        # Thread-pool workers run `process` concurrently and share the caches above
+        self._history_lock = threading.Lock()
+
+    @property
+    def bert_model(self):
+        return self.registry.get_keybert()
+
+    @property
+    def embedding_model(self):
+        return self.registry.get_encoder()
+
+    @property
+    def topic_model(self):
+        with self._components_lock:
+            if self._topic_model is None:
+                settings = self.worker_init_kwargs
+                self._topic_model = TopicModeling(
+                    min_topic_size=2, registry=self.registry, pool=self.pool, model_path=settings["topic_model_path"],
+                    online=settings["online_topics"], n_clusters=settings["topic_clusters"]
+                )
+        return self._topic_model
+
+    @property
+    def summary_comparator(self):
+        with self._components_lock:
+            if self._summary_comparator is None:
+                self._summary_comparator = SummaryComparator(registry=self.registry)
+        return self._summary_comparator
+
+    async def aprocess(self, text, compare_with_history=True):
+        """
+        Runs `process` in the worker pool so keyphrase extraction, embedding and
+        topic modeling do not block the event loop.
+        """
+        if self.pool.kind != "process":
+            return await self.pool.call(self, "process", text, compare_with_history)
 
-    def process(self, text, compare_with_history=True):
+        # Worker processes hold their own cache, so ship the history and record it here
+        with self._history_lock:
+            history = self.response_cache[-3:]
+        result = await self.pool.call(self, "process", text, compare_with_history, history)
+        self._remember(text)
+        return result
+
+    def process(self, text, compare_with_history=True, history=None):
         """
         Enhanced response processing with topic modeling and historical comparison.
         
         Args:
             text: Input text to process
             compare_with_history: Whether to compare with previous responses
+            history: Previous responses to compare with (defaults to the last 3 cached)
             
         Returns:
             Dictionary with extracted information and comparative analysis
         """
+        # Sentences, sentence embeddings and the document embedding, encoded once
+        context = AnalysisContext(text, self.embedding_model)
+
         # Basic processing
         keyphrases = self.bert_model.extract_keywords(
             text,
             keyphrase_ngram_range=(1, 2),
             stop_words=None,
             use_maxsum=True,
-            top_n=5
+            top_n=5,
+            doc_embeddings=context.document_embedding[None, :]
         )
         
         # Entity extraction
         entities = [(keyword, "ENTITY") for keyword in self.keyword_processor.extract_keywords(text)]
         
-        # Generate summary using sentence embeddings
-        sentences = [s.strip() for s in text.split(".") if s.strip()]
-        if sentences:
-            # Compute sentence embeddings
-            embeddings = self.embedding_model.encode(sentences, convert_to_tensor=True)
-
-            # Compute similarity across sentences
-            similarity_matrix = util.pytorch_cos_sim(embeddings, embeddings)
-
-            # Rank sentences by average similarity to others
-            mean_sim_scores = similarity_matrix.mean(dim=1)
-            top_idx = mean_sim_scores.argmax().item()
-
-            # Select the most representative sentence
-            summary = sentences[top_idx]
-        else:
-            summary = text
-
-        # Extract topics from the current response
-        current_topics = self.topic_model.extract_topics([text])
+        # Most representative sentence by average similarity to the others
+        summary = context.summary
+
+        # Match the current response against the fitted topics (no refit)
+        current_topics = self.topic_model.assign_topics([text], embeddings=context.document_embedding[None, :])
         
         # Comparative analysis with history
         historical_comparison = None
-        if compare_with_history and self.response_cache:
+        with self._history_lock:
+            history = self.response_cache[-3:] if history is None else list(history)  # Compare with last 3 responses
+            history_contexts = [self.context_cache.get(past) for past in history]
+        if compare_with_history and history:
             historical_comparison = self.summary_comparator.compare_summaries(
-                summaries=[text] + self.response_cache[-3:],  # Compare with last 3 responses
-                threshold=0.75
+                summaries=[text] + history,
+                threshold=0.75,
+                contexts=[context] + history_contexts
             )
 
         # Update response cache
-        self.response_cache.append(text)
-        if len(self.response_cache) > self.max_cache_size:
-            self.response_cache.pop(0)
+        self._remember(text, context)
 
         # Combine all analysis
         result = {
@@ -97,12 +147,51 @@ class ResponseProcessor:
             "summary": summary,
             "entities": entities,
             "keyphrases": [kp for kp, score in keyphrases],
-            "topics": current_topics["topic_info"].to_dict() if len(current_topics["topics"]) > 0 else {},
+            "topics": {
+                "topic": current_topics["topics"][0],
+                "label": current_topics["labels"][0],
+                "similarity": current_topics["similarities"][0]
+            },
             "historical_comparison": historical_comparison
         }
 
         return result
 
+    def _remember(self, text, context=None):
+        with self._history_lock:
+            self.response_cache.append(text)
+            if len(self.response_cache) > self.max_cache_size:
+                self.response_cache.pop(0)
+            if context is not None:
+                self.context_cache[text] = context
+                self.context_cache.move_to_end(text)
+                while len(self.context_cache) > self.max_cache_size:
+                    self.context_cache.popitem(last=False)
+
+    def refit_topics(self, texts):
+        """
+        Batch job: refits the topic model on `texts`, which refreshes the topics that
+        `process` assigns against, and saves it when a topic model path is set.
+        """
+        topics = self.topic_model.extract_topics(texts)
+        if self.topic_model.model_path:
+            self.topic_model.save()
+        return topics
+
+    def update_topic_model(self, texts):
+        """
+        Periodic job: folds `texts` into the topic model and saves it when a topic model
+        path is set. Online models are updated incrementally; otherwise the model is refitted.
+        """
+        if not self.topic_model.online:
+            return self.refit_topics(texts)
+        update = self.topic_model.update_topics(texts)
+        if update["new_topics"]:
+            logger.info(f"🆕 New topics: {update['new_topics']}")
+        if self.topic_model.model_path:
+            self.topic_model.save()
+        return update
+
     def batch_process(self, texts):
         """
         Process multiple responses together for comparative analysis.
@@ -117,7 +206,7 @@ class ResponseProcessor:
         individual_results = [self.process(text, compare_with_history=False) for text in texts]
         
         # Collective topic analysis
-        collective_topics = self.topic_model.extract_topics(texts)
+        collective_topics = self.refit_topics(texts)
         
         # Cross-response comparison
         comparison = self.summary_comparator.compare_summaries(
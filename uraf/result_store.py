@@ -0,0 +1,316 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single-writer use only
+    fcntl = None
+
+
+def extract_score(evaluation):
+    """
+    Returns the numeric URAF score of a stored evaluation, or None.
+    Handles plain scores, {"URAF Score": number} and {"URAF Score": {"Total Score": number}}.
+    """
+    if isinstance(evaluation, dict):
+        evaluation = evaluation.get("URAF Score")
+    if isinstance(evaluation, dict):
+        evaluation = evaluation.get("Total Score")
+    if isinstance(evaluation, (int, float)) and not isinstance(evaluation, bool):
+        return float(evaluation)
+    return None
+
+
+RECORD_FIELDS = ("timestamp", "model", "agent_type", "evaluation")
+
+
+def _as_timestamp(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class ResultStore:
+    """
+    Storage backend for benchmark results.
+    Filters (model, agent_type, since, until) are pushed down to the backend.
+    """
+
+    def append(self, records):
+        raise NotImplementedError
+
+    def iter_query(self, model=None, agent_type=None, since=None, until=None):
+        """Yields matching records one at a time with constant memory."""
+        raise NotImplementedError
+
+    def query(self, model=None, agent_type=None, since=None, until=None):
+        return list(self.iter_query(model=model, agent_type=agent_type, since=since, until=until))
+
+    def tail(self, position=0):
+        """
+        Yields (model, agent_type, score, position) for every record after `position`.
+        Positions are opaque, increasing markers used to resume incremental readers.
+        """
+        raise NotImplementedError
+
+    def end_position(self):
+        """Returns the position just past the last stored record."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JSONLResultStore(ResultStore):
+    """
+    Append-only JSON Lines file (the original `benchmark_results.json` format).
+    Queries scan the file, so prefer SQLiteResultStore for large histories.
+    Each append is one locked write, so several processes can share the file.
+    """
+
+    def __init__(self, path, fsync=False):
+        self.path = path
+        self.fsync = fsync
+
+    def append(self, records):
+        payload = "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
+        fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            # Start on a fresh line if a crashed writer left a truncated record behind
+            size = os.fstat(fd).st_size
+            if size > 0:
+                os.lseek(fd, size - 1, os.SEEK_SET)
+                if os.read(fd, 1) != b"\n":
+                    payload = b"\n" + payload
+            os.write(fd, payload)
+            if self.fsync:
+                os.fsync(fd)
+        finally:
+            # Closing the descriptor also releases the lock
+            os.close(fd)
+
+    def iter_query(self, model=None, agent_type=None, since=None, until=None):
+        """
+        Streams records line by line. Truncated or corrupt lines (e.g. left by a
+        crashed run) are skipped with a warning instead of aborting the scan.
+        """
+        if not os.path.exists(self.path):
+            return
+
+        since, until = _as_timestamp(since), _as_timestamp(until)
+        with open(self.path, "r") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    if not isinstance(record, dict) or not all(field in record for field in RECORD_FIELDS):
+                        raise ValueError("missing record fields")
+                    if model and record["model"] != model:
+                        continue
+                    if agent_type and record["agent_type"] != agent_type:
+                        continue
+                    if since and record["timestamp"] < since:
+                        continue
+                    if until and record["timestamp"] >= until:
+                        continue
+                except (ValueError, KeyError, TypeError):
+                    logger.warning(f"⚠️ Skipping corrupt record at {self.path}:{line_number}")
+                    continue
+                yield record
+
+    def tail(self, position=0):
+        """Reads complete lines from byte offset `position`; a trailing partial line is left for later."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(position)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return
+                position += len(line)
+                try:
+                    record = json.loads(line)
+                    yield record["model"], record["agent_type"], extract_score(record["evaluation"]), position
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+    def end_position(self):
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+
+class SQLiteResultStore(ResultStore):
+    """
+    SQLite-backed store with indexes on model, agent type and timestamp.
+    The numeric URAF score is kept in its own column so aggregations never parse JSON.
+    Each thread gets its own connection; WAL mode lets readers run alongside the writer.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            model TEXT NOT NULL,
+            agent_type TEXT NOT NULL,
+            score REAL,
+            evaluation TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_results_model_timestamp ON results (model, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_results_agent_timestamp ON results (agent_type, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_results_timestamp ON results (timestamp);
+    """
+
+    def __init__(self, path, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        self._local = threading.local()
+        self._connections = []
+        self.connection.executescript(self.SCHEMA)
+
+    @property
+    def connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # NORMAL only syncs at checkpoints in WAL mode; FULL syncs every commit
+            connection.execute(f"PRAGMA synchronous={'FULL' if self.fsync else 'NORMAL'}")
+            self._local.connection = connection
+            self._connections.append(connection)
+        return connection
+
+    def append(self, records):
+        rows = [
+            (record["timestamp"], record["model"], record["agent_type"],
+             extract_score(record["evaluation"]), json.dumps(record["evaluation"]))
+            for record in records
+        ]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO results (timestamp, model, agent_type, score, evaluation) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def _where(self, model, agent_type, since, until):
+        clauses, params = [], []
+        for clause, value in (("model = ?", model), ("agent_type = ?", agent_type),
+                              ("timestamp >= ?", _as_timestamp(since)), ("timestamp < ?", _as_timestamp(until))):
+            if value:
+                clauses.append(clause)
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def iter_query(self, model=None, agent_type=None, since=None, until=None):
+        where, params = self._where(model, agent_type, since, until)
+        cursor = self.connection.execute(
+            f"SELECT timestamp, model, agent_type, evaluation FROM results{where} ORDER BY id", params
+        )
+        for timestamp, model_name, agent, evaluation in cursor:
+            yield {"timestamp": timestamp, "model": model_name, "agent_type": agent, "evaluation": json.loads(evaluation)}
+
+    def scores(self, model=None, agent_type=None, since=None, until=None):
+        """Returns (model, agent_type, score) rows without decoding evaluations."""
+        where, params = self._where(model, agent_type, since, until)
+        return self.connection.execute(
+            f"SELECT model, agent_type, score FROM results{where} ORDER BY id", params
+        ).fetchall()
+
+    def tail(self, position=0):
+        cursor = self.connection.execute(
+            "SELECT model, agent_type, score, id FROM results WHERE id > ? ORDER BY id", (position,)
+        )
+        yield from cursor
+
+    def end_position(self):
+        return self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM results").fetchone()[0]
+
+    def close(self):
+        for connection in self._connections:
+            connection.close()
+        self._connections = []
+        self._local = threading.local()
+
+
+class BufferedResultWriter:
+    """
+    Batches records in memory and appends them to a ResultStore in one write when
+    `max_records` are buffered, when the oldest has waited `max_delay` seconds
+    (checked by a background thread), or on flush/close.
+    """
+
+    def __init__(self, store, max_records=100, max_delay=1.0, on_flush=None):
+        self.store = store
+        self.max_records = max_records
+        self.max_delay = max_delay
+        self.on_flush = on_flush
+        self._buffer = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = None
+        if max_delay:
+            self._thread = threading.Thread(target=self._flush_periodically, name="uraf-result-writer", daemon=True)
+            self._thread.start()
+
+    def write(self, record):
+        with self._lock:
+            if not self._buffer:
+                self._oldest = time.monotonic()
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.max_records
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Writes all buffered records now."""
+        with self._lock:
+            records, self._buffer = self._buffer, []
+            if records:
+                try:
+                    self.store.append(records)
+                except Exception:
+                    # Keep the batch (ahead of anything newer) so the next flush retries it
+                    self._buffer = records + self._buffer
+                    raise
+        if records and self.on_flush:
+            self.on_flush()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.max_delay / 2):
+            if self._buffer and time.monotonic() - self._oldest >= self.max_delay:
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"❌ Failed to flush benchmark results: {str(e)}")
+
+    def close(self):
+        """Stops the background flusher and writes any remaining records."""
+        self._closed.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+
+def open_result_store(path, backend=None, fsync=False):
+    """
+    Opens the result store for `path`.
+    `backend` is "jsonl" or "sqlite"; by default it is chosen from the file extension.
+    With `fsync`, every write is forced to disk before it returns.
+    """
+    if backend is None:
+        backend = "sqlite" if path.endswith(SQLITE_EXTENSIONS) else "jsonl"
+    if backend == "sqlite":
+        return SQLiteResultStore(path, fsync)
+    if backend == "jsonl":
+        return JSONLResultStore(path, fsync)
+    logger.error(f"Unknown storage backend '{backend}'")
+    raise ValueError(f"Unknown storage backend '{backend}', expected 'jsonl' or 'sqlite'")
@@ -1,6 +1,13 @@
-from sentence_transformers import SentenceTransformer, util
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from .analysis_context import AnalysisContext
+from .model_registry import DEFAULT_EMBEDDING_MODEL, ModelRegistry, get_registry
+
+
+def _cosine_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.maximum(np.linalg.norm(a, axis=-1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=-1, keepdims=True), 1e-12)
+    return a @ b.T
 
 class SummaryComparator:
     """
@@ -9,13 +16,15 @@ class SummaryComparator:
     across different LLM-generated summaries.
     """
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
-        self.model = SentenceTransformer(model_name)
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL, registry: ModelRegistry = None):
+        self.registry = registry or get_registry()
+        self.model = self.registry.get_encoder(model_name)
         
     def compare_summaries(self, 
                          summaries: List[str], 
                          original_text: str = None,
-                         threshold: float = 0.75) -> Dict[str, Any]:
+                         threshold: float = 0.75,
+                         contexts: Optional[List[Optional[AnalysisContext]]] = None) -> Dict[str, Any]:
         """
         Comprehensive comparison of multiple LLM-generated summaries.
         
@@ -23,6 +32,8 @@ class SummaryComparator:
             summaries: List of summaries from different LLMs
             original_text: Optional original text for content preservation analysis
             threshold: Similarity threshold for identifying significant differences
+            contexts: Optional AnalysisContext per summary (None entries allowed) whose
+                embeddings are reused instead of encoding the summary again
         
         Returns:
             Dictionary containing:
@@ -31,20 +42,26 @@ class SummaryComparator:
             - content_preservation: How well each summary preserves original content
             - consensus_summary: Most representative summary
         """
-        # Encode all summaries
-        summary_embeddings = self.model.encode(summaries, convert_to_tensor=True)
+        # Sentences and embeddings of every summary without a context, in one batched encode
+        contexts = list(contexts or [None] * len(summaries))
+        missing = [i for i, context in enumerate(contexts) if context is None]
+        for i, context in zip(missing, AnalysisContext.build_many([summaries[i] for i in missing], self.model)):
+            contexts[i] = context
+
+        # Embeddings of all summaries
+        summary_embeddings = np.stack([context.document_embedding for context in contexts])
         
         # Compute pairwise similarities
-        similarity_matrix = util.pytorch_cos_sim(summary_embeddings, summary_embeddings)
+        similarity_matrix = _cosine_matrix(summary_embeddings, summary_embeddings)
         
         # Calculate coherence scores
-        coherence_scores = self._calculate_coherence(summaries)
+        coherence_scores = self._calculate_coherence(contexts)
         
         # Content preservation analysis
         content_preservation = None
         if original_text:
             content_preservation = self._analyze_content_preservation(
-                summaries, original_text
+                summary_embeddings, original_text
             )
         
         # Find consensus summary
@@ -63,57 +80,30 @@ class SummaryComparator:
             "significant_differences": differences
         }
     
-    def _calculate_coherence(self, summaries: List[str]) -> List[float]:
+    def _calculate_coherence(self, contexts: List[AnalysisContext]) -> List[float]:
         """
         Calculate coherence score for each summary based on sentence-level similarity.
         """
-        coherence_scores = []
-        
-        for summary in summaries:
-            # Split into sentences and encode
-            sentences = [s.strip() for s in summary.split('.') if s.strip()]
-            if len(sentences) < 2:
-                coherence_scores.append(1.0)  # Perfect coherence for single sentence
-                continue
-                
-            # Calculate sentence embeddings
-            sentence_embeddings = self.model.encode(sentences, convert_to_tensor=True)
-            
-            # Calculate adjacent sentence similarities
-            similarities = util.pytorch_cos_sim(
-                sentence_embeddings[:-1], 
-                sentence_embeddings[1:]
-            )
-            
-            # Average similarity as coherence score
-            coherence_scores.append(float(similarities.mean()))
-            
-        return coherence_scores
+        return [context.coherence for context in contexts]
     
     def _analyze_content_preservation(self, 
-                                    summaries: List[str], 
+                                    summary_embeddings: np.ndarray, 
                                     original_text: str) -> List[float]:
         """
         Analyze how well each summary preserves the original content.
         """
         # Encode original text
-        original_embedding = self.model.encode(original_text, convert_to_tensor=True)
+        original_embedding = np.asarray(self.model.encode([original_text]))
         
-        # Encode and compare each summary
-        preservation_scores = []
-        for summary in summaries:
-            summary_embedding = self.model.encode(summary, convert_to_tensor=True)
-            score = float(util.pytorch_cos_sim(original_embedding, summary_embedding))
-            preservation_scores.append(score)
-            
-        return preservation_scores
+        # Compare it with every summary at once
+        return [float(score) for score in _cosine_matrix(summary_embeddings, original_embedding)[:, 0]]
     
     def _find_consensus_summary(self, similarity_matrix) -> int:
         """
         Find the summary that best represents the consensus across all summaries.
         """
         # Calculate average similarity of each summary to all others
-        mean_similarities = similarity_matrix.mean(dim=1)
+        mean_similarities = similarity_matrix.mean(axis=1)
         return int(mean_similarities.argmax())
     
     def _identify_differences(self, 
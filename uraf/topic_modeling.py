@@ -1,55 +1,174 @@
-from bertopic import BERTopic
-from sentence_transformers import SentenceTransformer
+import json
+import os
+import threading
 import numpy as np
+from loguru import logger
+from .model_registry import get_registry
+from .worker_pool import get_default_pool
 
 class TopicModeling:
     """
     Topic modeling using BERTopic with real-time analysis capabilities.
     Extracts high-level themes from LLM responses and supports incremental updates.
+
+    With `online=True` BERTopic is built from IncrementalPCA, MiniBatchKMeans and an
+    OnlineCountVectorizer, so `update_topics` can `partial_fit` new responses without
+    reprocessing history. The default UMAP + HDBSCAN setup cannot be updated that way;
+    there `update_topics` folds new responses into the nearest known topics instead.
     """
 
-    def __init__(self, min_topic_size=3):
-        self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-        # Initialize BERTopic with parameters optimized for LLM responses
-        self.topic_model = BERTopic(
+    MODEL_FILE = "bertopic.pkl"
+    STATE_FILE = "topics.json"
+    SUMS_FILE = "topic_sums.npy"
+    PENDING_DOCS_FILE = "pending.json"
+    PENDING_EMBEDDINGS_FILE = "pending.npy"
+
+    def __init__(self, min_topic_size=3, registry=None, pool=None, model_path=None, online=False, n_clusters=20):
+        self.registry = registry or get_registry()
+        self.pool = pool or get_default_pool(self.registry)
+        self.model_path = model_path
+        self.online = online
+        self.n_clusters = n_clusters
+        self.worker_init_kwargs = {"min_topic_size": min_topic_size, "model_path": model_path,
+                                   "online": online, "n_clusters": n_clusters}
+        self.min_topic_size = min_topic_size
+        # BERTopic is built on first use; centroid assignment alone never needs it
+        self._topic_model = None
+        self._model_lock = threading.Lock()
+        self.topic_cache = {}  # Cache for incremental updates
+
+        # Running embedding sum and count per topic; their normalized sums are the centroids
+        # used for cheap per-response assignment
+        self.topic_sums = {}
+        self.topic_counts = {}
+        self.centroid_topics = []
+        self.centroids = None
+        self.topic_labels = {}
+        self.known_topics = set()
+
+        # Online mode: responses waiting for a batch large enough to partial_fit
+        self._pending_docs = []
+        self._pending_embeddings = []
+        self._online_fitted = False
+
+        if model_path:
+            self.load(model_path)
+
+    @property
+    def embedding_model(self):
+        return self.registry.get_sentence_transformer()
+
+    @property
+    def encoder(self):
+        return self.registry.get_encoder()
+
+    @property
+    def topic_model(self):
+        with self._model_lock:
+            if self._topic_model is None:
+                self._topic_model = self._build_model()
+        return self._topic_model
+
+    @topic_model.setter
+    def topic_model(self, model):
+        self._topic_model = model
+
+    def _build_model(self):
+        """BERTopic with parameters optimized for LLM responses."""
+        if self.online:
+            return self._build_online_model()
+        from bertopic import BERTopic
+        return BERTopic(
             embedding_model=self.embedding_model,
-            min_topic_size=min_topic_size,
+            min_topic_size=self.min_topic_size,
+            verbose=True
+        )
+
+    def _build_online_model(self):
+        """BERTopic configuration whose components all support `partial_fit`."""
+        from bertopic import BERTopic
+        from bertopic.vectorizers import OnlineCountVectorizer
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.decomposition import IncrementalPCA
+
+        return BERTopic(
+            embedding_model=self.embedding_model,
+            umap_model=IncrementalPCA(n_components=5),
+            hdbscan_model=MiniBatchKMeans(n_clusters=self.n_clusters, random_state=0),
+            vectorizer_model=OnlineCountVectorizer(stop_words="english", decay=0.01),
             verbose=True
         )
-        self.topic_cache = {}  # Cache for incremental updates
 
-    def extract_topics(self, responses, batch_size=32):
+    def extract_topics(self, responses, batch_size=32, embeddings=None, max_fit_docs=20000, seed=42):
         """
-        Extracts key themes from multiple LLM responses with batched processing.
-        
+        Extracts key themes from multiple LLM responses.
+
+        All responses are embedded once (in `batch_size` passes, served from the embedding
+        cache where possible) and the model is fitted once. Corpora larger than `max_fit_docs`
+        are fitted on a random sample and the remaining documents are assigned with `transform`.
+
         Args:
             responses: List of LLM-generated texts
-            batch_size: Size of batches for processing large sets of responses
-        
+            batch_size: Encoder batch size
+            embeddings: Optional precomputed embeddings aligned with `responses`
+            max_fit_docs: Maximum number of documents UMAP/HDBSCAN are fitted on
+            seed: Seed for choosing the fit sample
+
         Returns:
             Dictionary containing:
             - topics: List of topic IDs
-            - topic_info: DataFrame with topic details
+            - topic_info: DataFrame with topic details (counts cover the fitted documents)
             - representative_docs: Most representative document per topic
         """
-        # Process in batches for memory efficiency
-        topics, probs = [], []
-        for i in range(0, len(responses), batch_size):
-            batch = responses[i:i + batch_size]
-            batch_topics, batch_probs = self.topic_model.fit_transform(batch)
-            topics.extend(batch_topics)
-            probs.extend(batch_probs)
+        responses = list(responses)
+        if embeddings is None:
+            embeddings = self.encoder.encode(responses, batch_size=batch_size)
+        embeddings = np.asarray(embeddings)
+
+        if len(responses) <= max_fit_docs:
+            topics, _ = self.topic_model.fit_transform(responses, embeddings=embeddings)
+            topics = list(topics)
+            self._online_fitted = self.online
+        else:
+            rng = np.random.default_rng(seed)
+            fit_idx = np.sort(rng.choice(len(responses), size=max_fit_docs, replace=False))
+            rest_idx = np.setdiff1d(np.arange(len(responses)), fit_idx)
+
+            fit_topics, _ = self.topic_model.fit_transform(
+                [responses[i] for i in fit_idx], embeddings=embeddings[fit_idx]
+            )
+            self._online_fitted = self.online
+            topics = [None] * len(responses)
+            for i, topic in zip(fit_idx, fit_topics):
+                topics[i] = topic
+            # Assign everything else against the fitted model without refitting
+            for start in range(0, len(rest_idx), max_fit_docs):
+                chunk = rest_idx[start:start + max_fit_docs]
+                chunk_topics, _ = self.topic_model.transform(
+                    [responses[i] for i in chunk], embeddings=embeddings[chunk]
+                )
+                for i, topic in zip(chunk, chunk_topics):
+                    topics[i] = topic
 
         # Get topic information
         topic_info = self.topic_model.get_topic_info()
-        
-        # Find most representative document per topic
-        topic_docs = {}
-        for topic_id in set(topics):
+
+        # Find most representative document per topic, reusing the embeddings
+        members = {}
+        for index, topic_id in enumerate(topics):
             if topic_id != -1:  # Skip outlier topic
-                topic_docs[topic_id] = self._get_representative_doc(
-                    [doc for doc, t in zip(responses, topics) if t == topic_id]
-                )
+                members.setdefault(topic_id, []).append(index)
+        self.topic_sums, self.topic_counts = {}, {}
+        self._fold_into_centroids(topics, embeddings)
+        self._refresh_labels(topic_info)
+        self.known_topics = set(self.topic_sums)
+        self.topic_cache["topic_info"] = topic_info
+        topic_docs = {
+            topic_id: self._get_representative_doc(
+                [responses[i] for i in indices], embeddings=embeddings[indices]
+            )
+            for topic_id, indices in members.items()
+        }
 
         return {
             "topics": topics,
@@ -57,22 +176,180 @@ class TopicModeling:
             "representative_docs": topic_docs
         }
 
-    def update_topics(self, new_responses):
+    async def aextract_topics(self, responses, batch_size=32, embeddings=None, max_fit_docs=20000):
+        """Runs `extract_topics` in the worker pool."""
+        return await self.pool.call(
+            self, "extract_topics", list(responses), batch_size, embeddings=embeddings, max_fit_docs=max_fit_docs
+        )
+
+    def assign_topics(self, responses, embeddings=None, min_similarity=0.3):
+        """
+        Assigns responses to already fitted topics by cosine similarity to the topic
+        centroids. No model is fitted, so this is cheap enough to run per response.
+
+        Returns:
+            Dictionary with per-response `topics` (-1 when nothing is similar enough
+            or no model has been fitted yet), `labels` and `similarities`
+        """
+        responses = list(responses)
+        if self.centroids is None or not responses:
+            return {"topics": [-1] * len(responses), "labels": [None] * len(responses),
+                    "similarities": [0.0] * len(responses)}
+
+        if embeddings is None:
+            embeddings = self.encoder.encode(responses)
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        similarities = (embeddings / np.maximum(norms, 1e-12)) @ self.centroids.T
+
+        best = similarities.argmax(axis=1)
+        best_similarity = similarities[np.arange(len(responses)), best]
+        topics = [self.centroid_topics[i] if score >= min_similarity else -1
+                  for i, score in zip(best, best_similarity)]
+        return {
+            "topics": topics,
+            "labels": [self.topic_labels.get(topic) for topic in topics],
+            "similarities": [float(score) for score in best_similarity]
+        }
+
+    def _fold_into_centroids(self, topics, embeddings):
+        """Adds documents to the running per-topic embedding sums and rebuilds the centroids."""
+        for topic_id, embedding in zip(topics, embeddings):
+            topic_id = int(topic_id)
+            if topic_id == -1:
+                continue
+            if topic_id in self.topic_sums:
+                self.topic_sums[topic_id] += embedding
+                self.topic_counts[topic_id] += 1
+            else:
+                self.topic_sums[topic_id] = np.array(embedding, dtype=np.float64)
+                self.topic_counts[topic_id] = 1
+
+        if not self.topic_sums:
+            self.centroid_topics, self.centroids = [], None
+            return
+        self.centroid_topics = sorted(self.topic_sums)
+        sums = np.stack([self.topic_sums[topic_id] for topic_id in self.centroid_topics])
+        self.centroids = (sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)).astype(np.float32)
+
+    def _centroid_topic_info(self):
+        """Topic table (Topic, Count, Name) built from the running centroid counts and labels."""
+        import pandas as pd
+
+        return pd.DataFrame({
+            "Topic": self.centroid_topics,
+            "Count": [self.topic_counts[topic] for topic in self.centroid_topics],
+            "Name": [self.topic_labels.get(topic, str(topic)) for topic in self.centroid_topics]
+        })
+
+    def _refresh_labels(self, topic_info):
+        try:
+            self.topic_labels = {int(topic): name for topic, name in zip(topic_info["Topic"], topic_info["Name"])}
+        except (KeyError, TypeError):
+            self.topic_labels = {}
+
+    def save(self, path=None):
+        """
+        Persists the topic state to the `path` directory: per-topic embedding sums,
+        counts and labels, plus (in online mode) the BERTopic model itself and any
+        responses still waiting for a batch large enough to `partial_fit`.
+        """
+        path = path or self.model_path
+        if self.centroids is None and not self._pending_docs:
+            logger.warning("⚠️ No fitted topics to save")
+            return
+        os.makedirs(path, exist_ok=True)
+        if self.centroids is not None:
+            np.save(os.path.join(path, self.SUMS_FILE), np.stack([self.topic_sums[t] for t in self.centroid_topics]))
+            with open(os.path.join(path, self.STATE_FILE), "w") as f:
+                json.dump({
+                    "topics": [int(t) for t in self.centroid_topics],
+                    "counts": [self.topic_counts[t] for t in self.centroid_topics],
+                    "labels": {str(t): label for t, label in self.topic_labels.items()},
+                    "known_topics": sorted(int(t) for t in self.known_topics)
+                }, f)
+        if self.online and self._online_fitted:
+            self.topic_model.save(os.path.join(path, self.MODEL_FILE), serialization="pickle", save_embedding_model=False)
+
+        pending_docs_path = os.path.join(path, self.PENDING_DOCS_FILE)
+        pending_embeddings_path = os.path.join(path, self.PENDING_EMBEDDINGS_FILE)
+        if self._pending_docs:
+            np.save(pending_embeddings_path, np.concatenate(self._pending_embeddings))
+            with open(pending_docs_path, "w") as f:
+                json.dump(self._pending_docs, f)
+        else:
+            for pending_path in (pending_docs_path, pending_embeddings_path):
+                if os.path.exists(pending_path):
+                    os.remove(pending_path)
+        logger.info(f"💾 Saved {len(self.centroid_topics)} topics ({len(self._pending_docs)} pending responses) to {path}")
+
+    def load(self, path=None):
+        """Loads topic state saved by `save`. Returns False if none exists yet."""
+        path = path or self.model_path
+        loaded = False
+        sums_path = os.path.join(path, self.SUMS_FILE)
+        if os.path.exists(sums_path):
+            with open(os.path.join(path, self.STATE_FILE)) as f:
+                state = json.load(f)
+            sums = np.load(sums_path)
+            self.topic_sums = {topic: vector.astype(np.float64) for topic, vector in zip(state["topics"], sums)}
+            self.topic_counts = dict(zip(state["topics"], state["counts"]))
+            self.topic_labels = {int(t): label for t, label in state["labels"].items()}
+            self.known_topics = set(state.get("known_topics", state["topics"]))
+            self._fold_into_centroids([], [])
+            loaded = True
+
+        model_file = os.path.join(path, self.MODEL_FILE)
+        if self.online and os.path.exists(model_file):
+            from bertopic import BERTopic
+            self.topic_model = BERTopic.load(model_file, embedding_model=self.embedding_model)
+            self._online_fitted = True
+            loaded = True
+
+        pending_docs_path = os.path.join(path, self.PENDING_DOCS_FILE)
+        if self.online and os.path.exists(pending_docs_path):
+            with open(pending_docs_path) as f:
+                self._pending_docs = json.load(f)
+            self._pending_embeddings = [np.load(os.path.join(path, self.PENDING_EMBEDDINGS_FILE))]
+            loaded = True
+
+        if loaded:
+            logger.info(f"📂 Loaded {len(self.centroid_topics)} topics ({len(self._pending_docs)} pending responses) from {path}")
+        return loaded
+
+    def update_topics(self, new_responses, embeddings=None):
         """
         Real-time update of topics with new responses.
         Efficiently updates the topic model without full retraining.
         
         Args:
             new_responses: List of new LLM responses to analyze
+            embeddings: Optional precomputed embeddings aligned with `new_responses`
         
         Returns:
-            Dictionary with updated topic information
+            Dictionary with the new responses' `topics`, the updated topic information
+            and the topics that emerged with this update
         """
-        # Update the topic model incrementally
-        self.topic_model.partial_fit(new_responses)
-        
+        new_responses = list(new_responses)
+        if not new_responses:
+            return {"topics": [], "updated_topics": self.topic_cache.get("topic_info"), "new_topics": []}
+        if embeddings is None:
+            embeddings = self.encoder.encode(new_responses)
+        embeddings = np.asarray(embeddings)
+
+        if self.online:
+            topics = self._partial_fit(new_responses, embeddings)
+        else:
+            # UMAP + HDBSCAN cannot partial_fit: fold responses into the nearest known topics
+            topics = self.assign_topics(new_responses, embeddings=embeddings)["topics"]
+            self._fold_into_centroids(topics, embeddings)
+            self.topic_cache["topic_info"] = self._centroid_topic_info()
+
         # Get updated topic information
-        updated_info = self.topic_model.get_topic_info()
+        updated_info = self.topic_cache.get("topic_info")
+        if updated_info is None:
+            # Nothing fitted in this process yet (e.g. state came from `load`)
+            updated_info = self.topic_model.get_topic_info() if self._online_fitted else self._centroid_topic_info()
         
         # Cache the results for future updates
         self.topic_cache.update({
@@ -81,37 +358,63 @@ class TopicModeling:
         })
         
         return {
+            "topics": topics,
             "updated_topics": updated_info,
-            "new_topics": self._detect_new_topics(updated_info)
+            "new_topics": self._detect_new_topics()
         }
 
-    def _get_representative_doc(self, docs):
+    def _partial_fit(self, responses, embeddings):
+        """
+        Online update. IncrementalPCA needs at least as many documents per batch as it has
+        components (and MiniBatchKMeans as many as clusters on its first batch), so smaller
+        updates are buffered and meanwhile matched against the current centroids.
+        """
+        self._pending_docs.extend(responses)
+        self._pending_embeddings.append(embeddings)
+        minimum = 5 if self._online_fitted else max(5, self.n_clusters)
+        if len(self._pending_docs) < minimum:
+            return self.assign_topics(responses, embeddings=embeddings)["topics"]
+
+        docs, batch_embeddings = self._pending_docs, np.concatenate(self._pending_embeddings)
+        self._pending_docs, self._pending_embeddings = [], []
+        self.topic_model.partial_fit(docs, embeddings=batch_embeddings)
+        self._online_fitted = True
+
+        batch_topics = [int(topic) for topic in self.topic_model.topics_]
+        self._fold_into_centroids(batch_topics, batch_embeddings)
+        topic_info = self.topic_model.get_topic_info()
+        self._refresh_labels(topic_info)
+        self.topic_cache["topic_info"] = topic_info
+        return batch_topics[-len(responses):]
+
+    def _get_representative_doc(self, docs, embeddings=None):
         """
         Find the most representative document for a topic using embeddings.
+        Pass the documents' `embeddings` when they are already known to skip encoding.
         """
         if not docs:
             return None
             
         # Get embeddings for all documents
-        embeddings = self.embedding_model.encode(docs, convert_to_tensor=True)
+        if embeddings is None:
+            embeddings = self.encoder.encode(docs)
+        embeddings = np.asarray(embeddings)
         
         # Calculate centroid
-        centroid = embeddings.mean(dim=0)
+        centroid = embeddings.mean(axis=0)
         
         # Find document closest to centroid
         similarities = embeddings @ centroid
-        most_representative_idx = similarities.argmax().item()
+        most_representative_idx = int(similarities.argmax())
         
         return docs[most_representative_idx]
 
-    def _detect_new_topics(self, updated_info):
+    def _detect_new_topics(self):
         """
         Detect newly emerged topics after an update.
+        Only topic IDs are compared (including those of buffered responses fitted in this
+        update), so this stays cheap as history grows.
         """
-        if "topic_info" not in self.topic_cache:
-            return []
-            
-        old_topics = set(self.topic_cache["topic_info"]["Topic"])
-        new_topics = set(updated_info["Topic"])
-        
-        return list(new_topics - old_topics)
+        new_topics = set(self.topic_sums) - self.known_topics
+        self.known_topics |= new_topics
+        return sorted(new_topics)
@@ -0,0 +1,105 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from loguru import logger
+from .model_registry import DEFAULT_EMBEDDING_MODEL, get_registry
+
+# Per-process component instances used when running in a process pool
+_worker_instances = {}
+
+
+def _preload_models(model_names, registry=None):
+    """
+    Pool initializer: loads the shared models once per worker.
+    Threads warm the pool's registry; worker processes warm their own default registry,
+    which is the one their component instances use.
+    """
+    registry = registry or get_registry()
+    for model_name in model_names:
+        registry.get_encoder(model_name)
+
+
+def _call_in_worker(cls, init_kwargs, method, args, kwargs):
+    """Runs `method` on this worker's own instance of `cls`, creating it on first use."""
+    key = (cls, init_kwargs)
+    instance = _worker_instances.get(key)
+    if instance is None:
+        instance = cls(**dict(init_kwargs))
+        _worker_instances[key] = instance
+    return getattr(instance, method)(*args, **kwargs)
+
+
+class WorkerPool:
+    """
+    Runs CPU-bound NLP work (embedding, scoring, keyphrase extraction, topic modeling)
+    off the event loop in a thread or process pool, with models preloaded per worker.
+    Thread pools preload into `registry` (the default registry if None), so components
+    built with an injected registry should share a pool built with the same one.
+    """
+
+    def __init__(self, kind="thread", max_workers=None, preload_models=(DEFAULT_EMBEDDING_MODEL,), registry=None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown worker pool kind '{kind}', expected 'thread' or 'process'")
+        self.kind = kind
+        self.max_workers = max_workers or ((os.cpu_count() or 1) if kind == "process" else 4)
+        self.preload_models = tuple(preload_models)
+        self.registry = registry
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            logger.info(f"🧵 Starting {self.kind} pool with {self.max_workers} workers")
+            if self.kind == "process":
+                executor_cls, registry = ProcessPoolExecutor, None
+            else:
+                executor_cls, registry = ThreadPoolExecutor, self.registry
+            self._executor = executor_cls(
+                max_workers=self.max_workers,
+                initializer=_preload_models,
+                initargs=(self.preload_models, registry)
+            )
+        return self._executor
+
+    async def run(self, fn, *args, **kwargs):
+        """Runs `fn(*args, **kwargs)` in the pool. `fn` must be picklable for process pools."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), partial(fn, *args, **kwargs))
+
+    async def call(self, instance, method, *args, **kwargs):
+        """
+        Calls `instance.method(*args, **kwargs)` in the pool.
+        Threads share `instance`; worker processes use their own instance of the same
+        class built from `instance.worker_init_kwargs`, so only arguments and results
+        cross the process boundary.
+        """
+        if self.kind == "process":
+            init_kwargs = tuple(sorted(getattr(instance, "worker_init_kwargs", {}).items()))
+            return await self.run(_call_in_worker, type(instance), init_kwargs, method, args, kwargs)
+        return await self.run(getattr(instance, method), *args, **kwargs)
+
+    def shutdown(self, wait=True):
+        """Stops the pool's workers."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+_default_pool = None
+_registry_pools = {}
+
+
+def get_default_pool(registry=None):
+    """
+    Returns the shared default thread pool, created on first use.
+    Components with an injected registry get a shared pool that preloads into that registry.
+    """
+    global _default_pool
+    if registry is not None and registry is not get_registry():
+        pool = _registry_pools.get(registry)
+        if pool is None:
+            pool = _registry_pools[registry] = WorkerPool(registry=registry)
+        return pool
+    if _default_pool is None:
+        _default_pool = WorkerPool()
+    return _default_pool